@@ -5,8 +5,8 @@ from datetime import datetime, timezone
 import logging
 from typing import Optional, List, cast
 import tempfile
-import requests
-import io
+import hashlib
+import shutil
 
 try:
     import audioop  # type: ignore  # noqa: F401
@@ -33,6 +33,7 @@ except ModuleNotFoundError:
     sys.modules["audioop"] = audioop_stub
     warnings.warn("audioop module not available; Discord voice features disabled.", RuntimeWarning)
 
+import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import tasks
@@ -42,7 +43,8 @@ from .db import init_db, get_config, set_channel, set_threshold, set_location, s
 from .forecast import ForecastEngine, AlertBuild
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
+logger = logging.getLogger('aurora')
 
 DISCORD_TOKEN = os.getenv('DISCORD_BOT_TOKEN', '')
 DISCORD_CLIENT_ID = os.getenv('DISCORD_CLIENT_ID')
@@ -62,18 +64,35 @@ if DISCORD_CLIENT_ID:
 else:
     app_id = None
 
-bot = discord.Client(intents=intents, application_id=app_id) if app_id else discord.Client(intents=intents)
+class AuroraClient(discord.Client):
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            # Release the image-download session and its keep-alive connector on shutdown
+            await _close_http_session()
+
+bot = AuroraClient(intents=intents, application_id=app_id) if app_id else AuroraClient(intents=intents)
 tree = app_commands.CommandTree(bot)
 
 # Explicit guard to prevent duplicate loop starts (e.g., multiple on_ready events)
 _UPDATER_STARTED = False
 _LAST_HEALTH: dict | None = None
+_HTTP_SESSION: aiohttp.ClientSession | None = None
+# Forecast PNG validators and the on-disk copy of the last body per image URL: url -> (ETag, Last-Modified, path)
+_IMAGE_CACHE: dict[str, tuple[str | None, str | None, str]] = {}
 
 # Background task interval in hours
 UPDATE_INTERVAL_HOURS = float(os.getenv('UPDATE_INTERVAL_HOURS', '2'))
 ALERT_DELETE_AFTER_MINUTES = int(os.getenv('ALERT_DELETE_AFTER_MINUTES', '15'))  # ephemeral high-Kp alert lifetime
 STARTUP_HEALTH_BLOCK = os.getenv('STARTUP_HEALTH_BLOCK', 'true').strip().lower() in ('1','true','yes')
 STARTUP_HEALTH_TIMEOUT = int(os.getenv('STARTUP_HEALTH_TIMEOUT_SECONDS', '25'))
+# Image URLs get a cache-bust token that only changes once per interval to avoid excessive re-fetching
+IMAGE_CACHE_BUST_INTERVAL_MIN = max(1, int(os.getenv('IMAGE_CACHE_BUST_INTERVAL_MIN', '30') or '30'))
+IMAGE_MAX_BYTES = 8 * 1024 * 1024  # abort downloads beyond Discord's default attachment limit
+IMAGE_CHUNK_BYTES = 64 * 1024
+IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'aurora_image_cache')
+UPDATER_CONCURRENCY = max(1, int(os.getenv('UPDATER_CONCURRENCY', '5') or '5'))  # guilds refreshed in parallel per cycle
 
 REQUIRED_SOURCES = ["noaa_forecast", "gfz", "swpc_planetary"]
 OPTIONAL_SOURCES = ["cloud_cover", "ovation", "maf", "afm_snapshot", "swpc_hemi"]
@@ -89,6 +108,13 @@ def _engine_for_guild(cfg: Optional[dict]) -> ForecastEngine:
         timezone_name=DEFAULT_TZ,
     )
 
+def _cache_bust(url: str, ts: int) -> str:
+    """Append the interval-floored cache-bust token for `ts` to an image URL."""
+    if not url:
+        return url
+    sep = '&' if ('?' in url) else '?'
+    return f"{url}{sep}v={int(ts // (IMAGE_CACHE_BUST_INTERVAL_MIN * 60))}"
+
 async def _run_blocking(fn, *args, timeout: int = 20):
     """Run a blocking function in executor with a timeout."""
     loop = asyncio.get_running_loop()
@@ -103,15 +129,16 @@ async def perform_startup_health(engine: ForecastEngine) -> dict:
             val = await coro
             results[label] = val
         except Exception:
-            logging.exception(f"Health check failed for {label}")
+            logger.exception("Health check failed for %s", label)
             results[label] = None
+    # Health must reflect the upstreams right now, so bypass the in-process forecast and source caches
     await asyncio.gather(
-        safe_call('noaa_raw', _run_blocking(engine.fetch_forecast, timeout=STARTUP_HEALTH_TIMEOUT)),
+        safe_call('noaa_raw', _run_blocking(lambda: engine.fetch_forecast(use_cache=False), timeout=STARTUP_HEALTH_TIMEOUT)),
         safe_call('gfz_raw', _run_blocking(engine.gfz_recent_blocks, 24, timeout=STARTUP_HEALTH_TIMEOUT)),
         safe_call('ovation_raw', _run_blocking(engine.fetch_ovation_probability, engine.latitude, engine.longitude, timeout=STARTUP_HEALTH_TIMEOUT)),
         safe_call('maf_raw', _run_blocking(engine.fetch_maf_data, engine.latitude, engine.longitude, engine.timezone_name, timeout=STARTUP_HEALTH_TIMEOUT)),
-        safe_call('cloud_raw', _run_blocking(engine.fetch_cloud_cover, timeout=STARTUP_HEALTH_TIMEOUT)),
-        safe_call('afm_raw', _run_blocking(engine.fetch_aurora_snapshot, engine.latitude, engine.longitude, timeout=STARTUP_HEALTH_TIMEOUT)),
+        safe_call('cloud_raw', _run_blocking(lambda: engine.fetch_cloud_cover(use_cache=False), timeout=STARTUP_HEALTH_TIMEOUT)),
+        safe_call('afm_raw', _run_blocking(lambda: engine.fetch_aurora_snapshot(engine.latitude, engine.longitude, use_cache=False), timeout=STARTUP_HEALTH_TIMEOUT)),
         safe_call('swpc_planetary_raw', _run_blocking(engine.fetch_swpc_planetary_k_latest, timeout=STARTUP_HEALTH_TIMEOUT)),
         safe_call('swpc_hemi_raw', _run_blocking(engine.fetch_swpc_hemi_power, timeout=STARTUP_HEALTH_TIMEOUT)),
     )
@@ -137,7 +164,7 @@ async def perform_startup_health(engine: ForecastEngine) -> dict:
     for k in REQUIRED_SOURCES + OPTIONAL_SOURCES:
         if k in health:
             summary_parts.append(f"{k}={'OK' if health[k] else 'FAIL'}")
-    logging.info("Startup health: " + ", ".join(summary_parts))
+    logger.info("Startup health: %s", ", ".join(summary_parts))
     return health
 
 @tasks.loop(minutes=30)
@@ -151,10 +178,10 @@ async def health_refresher():
         global _LAST_HEALTH
         _LAST_HEALTH = health
     except Exception:
-        logging.exception("Health refresher failed")
+        logger.exception("Health refresher failed")
 
-def format_embed(build: Optional[AlertBuild], engine: Optional[ForecastEngine]) -> discord.Embed:
-    detected_ts = int(datetime.now(timezone.utc).timestamp())
+def format_embed(build: Optional[AlertBuild], engine: Optional[ForecastEngine], now_ts: Optional[int] = None) -> discord.Embed:
+    detected_ts = now_ts if now_ts is not None else int(datetime.now(timezone.utc).timestamp())
     loc_name = engine.location_name if engine else os.getenv('LOCATION_NAME', 'Location')
     lat = engine.latitude if engine else float(os.getenv('LATITUDE', '0') or 0)
     lon = engine.longitude if engine else float(os.getenv('LONGITUDE', '0') or 0)
@@ -168,18 +195,8 @@ def format_embed(build: Optional[AlertBuild], engine: Optional[ForecastEngine])
     if build:
         tonight = (build.tonight_image_url or '').strip()
         tomorrow = (build.tomorrow_image_url or '').strip()
-        # Cache bust token: floor by interval to avoid excessive re-fetching.
-        interval_min = int(os.getenv('IMAGE_CACHE_BUST_INTERVAL_MIN', '30') or '30')
-        if interval_min < 1:
-            interval_min = 1
-        bust_token = int(detected_ts // (interval_min * 60))
-        def _bust(url: str) -> str:
-            if not url:
-                return url
-            sep = '&' if ('?' in url) else '?'
-            return f"{url}{sep}v={bust_token}"
-        tonight_busted = _bust(tonight)
-        tomorrow_busted = _bust(tomorrow)
+        tonight_busted = _cache_bust(tonight, detected_ts)
+        tomorrow_busted = _cache_bust(tomorrow, detected_ts)
         main_image = tonight_busted or tomorrow_busted
         if main_image:
             embed.set_image(url=main_image)
@@ -196,8 +213,9 @@ def format_embed(build: Optional[AlertBuild], engine: Optional[ForecastEngine])
     # Remove AFM and MAF individual source sections
     # Kp forecasts formatted by date with UT → localized time range bullets (chunk to avoid mid-line cutoffs)
     if build and build.detection_groups:
-        for date_label in sorted(build.detection_groups.keys()):
-            lines = [f"{date_label}"] + list(build.detection_groups[date_label])
+        # detection_groups is built in chronological order, so iterate it as-is
+        for date_label, bullets in build.detection_groups.items():
+            lines = [f"{date_label}"] + list(bullets)
             chunk: List[str] = []
             chunk_len = 0
             first_chunk = True
@@ -214,20 +232,19 @@ def format_embed(build: Optional[AlertBuild], engine: Optional[ForecastEngine])
             for line in lines:
                 # If a single line is extremely long, hard-truncate that line safely
                 safe_line = line
-                if len(safe_line) > 1024:
+                line_len = len(safe_line)
+                if line_len > 1024:
                     safe_line = safe_line[:1000] + " …"
-                add_len = (1 if chunk else 0) + len(safe_line)
-                if chunk_len + add_len > 1024:
+                    line_len = len(safe_line)
+                # Measure each line once; the stored length drives both the overflow check and the running total
+                if chunk and chunk_len + 1 + line_len > 1024:
                     flush_chunk(first_chunk)
-                    chunk = [safe_line]
-                    chunk_len = len(safe_line)
+                if chunk:
+                    chunk.append(safe_line)
+                    chunk_len += 1 + line_len
                 else:
-                    if chunk:
-                        chunk.append(safe_line)
-                        chunk_len += 1 + len(safe_line)
-                    else:
-                        chunk = [safe_line]
-                        chunk_len = len(safe_line)
+                    chunk = [safe_line]
+                    chunk_len = line_len
             flush_chunk(first_chunk)
     else:
         # Keep the header with a placeholder when no above-threshold forecasts are present
@@ -248,44 +265,100 @@ async def _prepare_image_attachments(tonight_url: str | None, tomorrow_url: str
     Returns (files, meta) where meta contains keys: 'main_name', 'thumb_name'.
     Deletes temp files are the caller's responsibility after send/edit completes.
     """
-    interval_min = int(os.getenv('IMAGE_CACHE_BUST_INTERVAL_MIN', '30') or '30')
-    if interval_min < 1:
-        interval_min = 1
-    bust_token = int(detected_ts // (interval_min * 60))
-
-    def _bust(url: str) -> str:
-        sep = '&' if ('?' in url) else '?'
-        return f"{url}{sep}v={bust_token}"
-
-    candidates: List[tuple[str, str]] = []  # (name, url)
+    candidates: List[tuple[str, str, str]] = []  # (name, url, cache-busted url)
     if tonight_url and tonight_url.strip():
-        candidates.append(('tonight.png', _bust(tonight_url.strip())))
+        candidates.append(('tonight.png', tonight_url.strip(), _cache_bust(tonight_url.strip(), detected_ts)))
     if tomorrow_url and tomorrow_url.strip():
         # Avoid duplicate if identical
-        busted_tom = _bust(tomorrow_url.strip())
-        if not candidates or candidates[0][1] != busted_tom:
-            candidates.append(('tomorrow.png', busted_tom))
+        busted_tom = _cache_bust(tomorrow_url.strip(), detected_ts)
+        if not candidates or candidates[0][2] != busted_tom:
+            candidates.append(('tomorrow.png', tomorrow_url.strip(), busted_tom))
 
-    tmp_paths: List[tuple[str, str]] = []  # (name, path)
-    files: List[discord.File] = []
-    for name, url in candidates:
+    session = await _http_session()
+
+    def _copy_to_temp(name: str, src: str) -> str:
+        fd, path = tempfile.mkstemp(prefix='aurora_', suffix='_' + name)
+        os.close(fd)
+        shutil.copyfile(src, path)
+        return path
+
+    def _persist(base_url: str, src: str) -> str:
+        # One validated copy per image URL; written beside the target and swapped in so readers never see a partial file
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        dest = os.path.join(IMAGE_CACHE_DIR, hashlib.sha1(base_url.encode('utf-8')).hexdigest() + '.png')
+        fd, tmp = tempfile.mkstemp(prefix='.tmp_', dir=IMAGE_CACHE_DIR)
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return dest
+
+    async def _download(name: str, base_url: str, url: str) -> Optional[tuple[str, str]]:
+        path: Optional[str] = None
+        # Validators are keyed on the un-busted URL; the static PNG behind each cache-bust token is the same file
+        cached = _IMAGE_CACHE.get(base_url)
+        if cached and not os.path.exists(cached[2]):
+            # The cached copy was cleaned up; fetch unconditionally so a 304 can't leave us without a body
+            _IMAGE_CACHE.pop(base_url, None)
+            cached = None
+        headers = {}
+        if cached:
+            if cached[0]:
+                headers['If-None-Match'] = cached[0]
+            if cached[1]:
+                headers['If-Modified-Since'] = cached[1]
         try:
-            resp = await asyncio.to_thread(lambda: requests.get(url, timeout=20))
-            if resp.status_code == 200 and resp.content:
-                # Write to temp file
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 304 and cached:
+                    return name, await asyncio.to_thread(_copy_to_temp, name, cached[2])
+                if resp.status != 200:
+                    return None
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+                # Stream straight to the temp file so the body is never held in memory whole
                 fd, path = tempfile.mkstemp(prefix='aurora_', suffix='_' + name)
+                written = 0
                 with os.fdopen(fd, 'wb') as f:
-                    f.write(resp.content)
-                tmp_paths.append((name, path))
+                    async for chunk in resp.content.iter_chunked(IMAGE_CHUNK_BYTES):
+                        written += len(chunk)
+                        if written > IMAGE_MAX_BYTES:
+                            logger.warning("Image %s exceeds %d bytes; skipping", url, IMAGE_MAX_BYTES)
+                            break
+                        f.write(chunk)
+            if 0 < written <= IMAGE_MAX_BYTES:
+                if etag or last_modified:
+                    try:
+                        cache_path = await asyncio.to_thread(_persist, base_url, path)
+                        _IMAGE_CACHE[base_url] = (etag, last_modified, cache_path)
+                    except Exception:
+                        logger.warning("Could not cache image %s on disk", base_url)
+                return name, path
         except Exception:
-            logging.exception(f"Image download failed for {url}")
+            logger.exception("Image download failed for %s", url)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return None
+
+    # Both images download concurrently over the shared session's connection pool
+    results = await asyncio.gather(*(_download(name, base_url, url) for name, base_url, url in candidates))
+    tmp_paths: List[tuple[str, str]] = [r for r in results if r]  # (name, path)
+    files: List[discord.File] = []
     # Build discord.File objects from temp paths
     for name, path in tmp_paths:
         try:
             fp = open(path, 'rb')
             files.append(discord.File(fp=fp, filename=name))
         except Exception:
-            logging.exception(f"Failed creating discord.File for {path}")
+            logger.exception("Failed creating discord.File for %s", path)
 
     meta = {}
     if tmp_paths:
@@ -301,6 +374,21 @@ async def _prepare_image_attachments(tonight_url: str | None, tomorrow_url: str
                 meta['thumb_name'] = names[1]
     return files, meta
 
+async def _http_session() -> aiohttp.ClientSession:
+    """Shared aiohttp session for bot-side downloads; created lazily on the running loop."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        # Keep idle sockets to the image host long enough for the other guilds in the same updater cycle to reuse them
+        connector = aiohttp.TCPConnector(limit_per_host=4, keepalive_timeout=60, ttl_dns_cache=300)
+        _HTTP_SESSION = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=20))
+    return _HTTP_SESSION
+
+async def _close_http_session() -> None:
+    global _HTTP_SESSION
+    session, _HTTP_SESSION = _HTTP_SESSION, None
+    if session is not None and not session.closed:
+        await session.close()
+
 def _cleanup_attachments(files: List[discord.File]):
     for f in files:
         try:
@@ -334,14 +422,30 @@ async def _find_latest_bot_embed(channel: discord.TextChannel) -> Optional[disco
         pass
     return None
 
-async def build_update_for_guild(guild: discord.Guild) -> tuple[str, str, str, str, str, Optional[ForecastEngine], Optional[AlertBuild]]:
-    cfg = await get_config(guild.id)
+async def build_update_for_guild(
+    guild: discord.Guild,
+    cfg: Optional[dict] = None,
+    builds: Optional[dict] = None,
+) -> tuple[str, str, str, str, str, Optional[ForecastEngine], Optional[AlertBuild]]:
+    """Build the update for one guild.
+    Pass `cfg` when it was already loaded, and a shared `builds` dict to reuse (possibly in-flight) builds across guilds with identical settings.
+    """
+    if cfg is None:
+        cfg = await get_config(guild.id)
     engine = _engine_for_guild(cfg)
     def _work():
         text = engine.fetch_forecast()
         build = engine.build_alert(text)
         return build
-    build = await asyncio.to_thread(_work)
+    build_key = (engine.kp_threshold, engine.latitude, engine.longitude, engine.location_name, engine.timezone_name)
+    if builds is not None:
+        # Store the pending task so concurrent guilds with the same settings await one build
+        task = builds.get(build_key)
+        if task is None:
+            task = builds[build_key] = asyncio.ensure_future(asyncio.to_thread(_work))
+        build = await task
+    else:
+        build = await asyncio.to_thread(_work)
     content = build.message if build else "No data."
     tonight_url = build.tonight_image_url if build else ''
     tomorrow_url = build.tomorrow_image_url if build else ''
@@ -378,7 +482,7 @@ async def _auto_delete(message: discord.Message, minutes: int):
         except (discord.NotFound, discord.Forbidden):
             pass
         except Exception:
-            logging.exception("Failed to delete alert message")
+            logger.exception("Failed to delete alert message")
     except Exception:
         pass
 
@@ -388,7 +492,7 @@ async def on_ready():
     try:
         await tree.sync()
     except Exception as e:
-        print(f"Command sync failed: {e}")
+        logger.warning("Command sync failed: %s", e)
     # Ensure commands appear immediately by syncing per guild
     try:
         for g in bot.guilds:
@@ -396,16 +500,16 @@ async def on_ready():
                 tree.copy_global_to(guild=g)
                 await tree.sync(guild=g)
             except Exception as ge:
-                print(f"Guild sync failed for {getattr(g, 'id', '?')}: {ge}")
+                logger.warning("Guild sync failed for %s: %s", getattr(g, 'id', '?'), ge)
     except Exception as e:
-        print(f"Per-guild sync loop failed: {e}")
+        logger.warning("Per-guild sync loop failed: %s", e)
     engine = _engine_for_guild(None)
     health = await perform_startup_health(engine)
     global _LAST_HEALTH, _UPDATER_STARTED
     _LAST_HEALTH = health
     required_ok = all(health.get(src) for src in REQUIRED_SOURCES)
     if not required_ok and STARTUP_HEALTH_BLOCK:
-        logging.warning("Required sources not healthy; deferring updater and scheduling retries.")
+        logger.warning("Required sources not healthy; deferring updater and scheduling retries.")
         async def _retry_start():
             global _LAST_HEALTH, _UPDATER_STARTED
             for attempt in range(1, 6):
@@ -413,7 +517,7 @@ async def on_ready():
                 h2 = await perform_startup_health(engine)
                 _LAST_HEALTH = h2
                 if all(h2.get(src) for src in REQUIRED_SOURCES):
-                    logging.info(f"Health recovered on attempt {attempt}; starting updater.")
+                    logger.info("Health recovered on attempt %s; starting updater.", attempt)
                     if not _UPDATER_STARTED and not updater.is_running():
                         try:
                             updater.start(); _UPDATER_STARTED = True
@@ -421,8 +525,8 @@ async def on_ready():
                             pass
                     return
                 else:
-                    logging.warning(f"Attempt {attempt}: required sources still unhealthy.")
-            logging.error("Health retries exhausted; starting updater anyway.")
+                    logger.warning("Attempt %s: required sources still unhealthy.", attempt)
+            logger.error("Health retries exhausted; starting updater anyway.")
             if not _UPDATER_STARTED and not updater.is_running():
                 try:
                     updater.start(); _UPDATER_STARTED = True
@@ -434,18 +538,18 @@ async def on_ready():
             try:
                 updater.start(); _UPDATER_STARTED = True
             except RuntimeError as e:
-                print(f"Updater start ignored: {e}")
+                logger.info("Updater start ignored: %s", e)
     # Start periodic health refresh
     if not health_refresher.is_running():
         health_refresher.start()
     if bot.user:
-        print(f"Logged in as {bot.user} (ID: {bot.user.id})")
+        logger.info("Logged in as %s (ID: %s)", bot.user, bot.user.id)
     else:
-        print("Logged in (bot user unknown)")
+        logger.info("Logged in (bot user unknown)")
 
 @bot.event
 async def on_error(event_method, *args, **kwargs):
-    logging.exception(f"Unhandled exception in event {event_method}")
+    logger.exception("Unhandled exception in event %s", event_method)
 
 @bot.event
 async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
@@ -459,11 +563,11 @@ async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
             if tracked and int(tracked) == int(msg_id):
                 try:
                     await clear_channel(guild_id)
-                    logging.info("Guild %s: tracked aurora message deleted; cleared channel configuration.", guild_id)
+                    logger.info("Guild %s: tracked aurora message deleted; cleared channel configuration.", guild_id)
                 except Exception:
-                    logging.exception("Guild %s: failed to clear channel on message delete.", guild_id)
+                    logger.exception("Guild %s: failed to clear channel on message delete.", guild_id)
     except Exception:
-        logging.exception("on_raw_message_delete handler failed")
+        logger.exception("on_raw_message_delete handler failed")
 
 @tree.command(name="aurora-set-channel", description="Set the channel for aurora updates")
 @app_commands.describe(channel="Channel to post the aurora updates to")
@@ -623,7 +727,7 @@ async def refresh_cmd(interaction: discord.Interaction):
             try:
                 await clear_channel(interaction.guild_id)
             except Exception:
-                logging.exception("Failed clearing channel after missing tracked message in refresh")
+                logger.exception("Failed clearing channel after missing tracked message in refresh")
             await interaction.followup.send("Original aurora message was deleted. Channel configuration cleared. Use /aurora-set-channel to reconfigure.", ephemeral=True)
             return
     content, tonight_url, tomorrow_url, window_id, det_sig, engine, build = await build_update_for_guild(interaction.guild)
@@ -740,133 +844,137 @@ async def gfz_hourly_cmd(interaction: discord.Interaction, hours_back: int = 72)
         embed.set_footer(text=str(source_note)[:2048])
     await interaction.followup.send(embed=embed, ephemeral=True)
 
-@tasks.loop(hours=UPDATE_INTERVAL_HOURS)
-async def updater():
-    await bot.wait_until_ready()
-    for guild in bot.guilds:
+async def _update_guild(guild: discord.Guild, builds: dict) -> None:
+    """Refresh one guild's tracked embed and send a high-Kp alert when new SWPC blocks appear."""
+    try:
+        cfg = await get_config(guild.id)
+        if not cfg or not cfg.get('channel_id'):
+            return
+        channel = guild.get_channel(int(cfg['channel_id']))
+        if not isinstance(channel, discord.TextChannel):
+            return
+        logger.info("Updater iteration guild=%s", guild.id)
+        tracked_id = cfg.get('message_id')
+        if not tracked_id:
+            logger.info("Guild %s: no tracked message id; skipping (awaiting /aurora-start).", guild.id)
+            return
+        content, tonight_url, tomorrow_url, window_id, det_sig, engine, build = await build_update_for_guild(guild, cfg, builds)
+        # One timestamp per guild update: embed "Updated", dedupe state and alert image cache-bust all agree
+        ts_now = int(datetime.now(timezone.utc).timestamp())
+        embed = format_embed(build, engine, now_ts=ts_now)
         try:
-            cfg = await get_config(guild.id)
-            if not cfg or not cfg.get('channel_id'):
-                continue
-            channel = guild.get_channel(int(cfg['channel_id']))
-            if not isinstance(channel, discord.TextChannel):
-                continue
-            logging.info(f"Updater iteration guild={guild.id}")
-            tracked_id = cfg.get('message_id')
-            if not tracked_id:
-                logging.info(f"Guild {guild.id}: no tracked message id; skipping (awaiting /aurora-start).")
-                continue
-            content, tonight_url, tomorrow_url, window_id, det_sig, engine, build = await build_update_for_guild(guild)
-            embed = format_embed(build, engine)
-            try:
-                msg = await channel.fetch_message(int(tracked_id))
-                await msg.edit(embed=embed)
-            except discord.NotFound:
-                # Tracked message is gone. Try latest bot embed; else clear channel config.
-                latest = await _find_latest_bot_embed(channel)
-                if latest:
-                    try:
-                        await latest.edit(embed=embed)
-                        await set_message_id(guild.id, latest.id)
-                    except Exception:
-                        logging.exception("Guild %s: failed to edit latest bot embed", guild.id)
-                        continue
-                else:
-                    try:
-                        await clear_channel(guild.id)
-                        logging.info("Guild %s: tracked message deleted; cleared channel configuration.", guild.id)
-                    except Exception:
-                        logging.exception("Guild %s: failed to clear channel after deletion.", guild.id)
-                    continue
-            except Exception:
-                logging.exception(f"Guild {guild.id}: failed to edit message; skipping this cycle.")
-                continue
-            combined_id = f"{window_id}|{det_sig}" if window_id else ''
-            prev = cfg.get('last_window_id') or ''
-            if combined_id:
-                ts_now = int(datetime.now(timezone.utc).timestamp())
-                if not prev:
-                    await set_last_window(guild.id, combined_id, ts_now)
-                elif combined_id != prev:
-                    old_sig = ''
-                    if '|' in prev:
-                        old_sig = prev.split('|', 1)[1]
-                    old_tokens = set(t for t in old_sig.split('|') if t)
-                    new_tokens = set(t for t in det_sig.split('|') if t)
-                    added = [t for t in new_tokens if t not in old_tokens]
-                    if added:
-                        alert_lines: List[str] = []
-                        swpc_block_map: dict[str, dict] = {}
-                        swpc_blocks_all = getattr(build, 'swpc_high_blocks', None) or []
-                        for blk in swpc_blocks_all:
-                            ts_val = blk.get('ts') if isinstance(blk, dict) else None
-                            kp_val = blk.get('kp') if isinstance(blk, dict) else None
-                            if isinstance(ts_val, int) and isinstance(kp_val, (int, float)):
-                                swpc_block_map[f"SWPC:{ts_val}:{kp_val}"] = blk
-                        for t in added:
-                            blk = swpc_block_map.get(t)
-                            if not blk and t.startswith('SWPC:'):
-                                # Fallback to parse token directly
-                                try:
-                                    _, ts_str, kp_str = t.split(':', 2)
-                                    blk = {'ts': int(float(ts_str)), 'kp': float(kp_str)}
-                                except Exception:
-                                    blk = None
-                            if not isinstance(blk, dict):
-                                continue
-                            ts_val = blk.get('ts') if isinstance(blk.get('ts'), int) else None
-                            kp_val = blk.get('kp') if isinstance(blk.get('kp'), (int, float)) else None
-                            if ts_val is None or kp_val is None:
-                                continue
-                            kind = blk.get('kind') if isinstance(blk.get('kind'), str) else ''
-                            kind_note = ' (est)' if kind == 'estimated' else ''
-                            alert_lines.append(f"SWPC Planetary Kp {kp_val:.2f}{kind_note} at <t:{ts_val}:t>")
-                        if alert_lines:
-                            threshold_display = engine.kp_threshold if engine else DEFAULT_KP
-                            header = f"⚠️ High Kp detected (≥ {threshold_display})"
-                            if build and build.aggregated_sources_line:
-                                header += f"\n{build.aggregated_sources_line}"
-
-                            # Pull the best viewing windows (sorted by visibility) for quick reading
-                            window_lines: List[str] = []
-                            if build and build.detections:
-                                top = sorted(build.detections, key=lambda d: d.visibility_pct, reverse=True)[:3]
-                                for det in top:
-                                    window_lines.append(
-                                        f"<t:{det.start_ts}:t>-<t:{det.end_ts}:t> • KP {det.kp:.2f} • 👀 {det.visibility_pct}%"
-                                    )
-                            else:
-                                # Fallback to the raw SWPC alert tokens if no detections are present
-                                window_lines = [str(x) for x in alert_lines if isinstance(x, str)][:3]
-
-                            alert_text = header
-                            if window_lines:
-                                alert_text += "\nBest windows:\n" + "\n".join(window_lines)
-
-                            def _bust(url: str) -> str:
-                                if not url:
-                                    return url
-                                interval_min = int(os.getenv('IMAGE_CACHE_BUST_INTERVAL_MIN', '30') or '30')
-                                if interval_min < 1:
-                                    interval_min = 1
-                                token = int(ts_now // (interval_min * 60))
-                                sep = '&' if ('?' in url) else '?'
-                                return f"{url}{sep}v={token}"
-
-                            if tonight_url:
-                                alert_text += f"\nTonight image: {_bust(tonight_url)}"
-                            if tomorrow_url and tomorrow_url != tonight_url:
-                                alert_text += f"\nTomorrow image: {_bust(tomorrow_url)}"
-
-                            alert_text += f"\n_(Will auto-delete in {ALERT_DELETE_AFTER_MINUTES} min)_"
+            msg = await channel.fetch_message(int(tracked_id))
+            await msg.edit(embed=embed)
+        except discord.NotFound:
+            # Tracked message is gone. Try latest bot embed; else clear channel config.
+            latest = await _find_latest_bot_embed(channel)
+            if latest:
+                try:
+                    await latest.edit(embed=embed)
+                    await set_message_id(guild.id, latest.id)
+                except Exception:
+                    logger.exception("Guild %s: failed to edit latest bot embed", guild.id)
+                    return
+            else:
+                try:
+                    await clear_channel(guild.id)
+                    logger.info("Guild %s: tracked message deleted; cleared channel configuration.", guild.id)
+                except Exception:
+                    logger.exception("Guild %s: failed to clear channel after deletion.", guild.id)
+                return
+        except Exception:
+            logger.exception("Guild %s: failed to edit message; skipping this cycle.", guild.id)
+            return
+        combined_id = f"{window_id}|{det_sig}" if window_id else ''
+        prev = cfg.get('last_window_id') or ''
+        if combined_id:
+            if not prev:
+                await set_last_window(guild.id, combined_id, ts_now)
+            elif combined_id != prev:
+                old_sig = ''
+                if '|' in prev:
+                    old_sig = prev.split('|', 1)[1]
+                old_tokens = set(t for t in old_sig.split('|') if t)
+                new_tokens = set(t for t in det_sig.split('|') if t)
+                added = [t for t in new_tokens if t not in old_tokens]
+                if added:
+                    alert_lines: List[str] = []
+                    swpc_block_map: dict[str, dict] = {}
+                    swpc_blocks_all = getattr(build, 'swpc_high_blocks', None) or []
+                    for blk in swpc_blocks_all:
+                        ts_val = blk.get('ts') if isinstance(blk, dict) else None
+                        kp_val = blk.get('kp') if isinstance(blk, dict) else None
+                        if isinstance(ts_val, int) and isinstance(kp_val, (int, float)):
+                            swpc_block_map[f"SWPC:{ts_val}:{kp_val}"] = blk
+                    for t in added:
+                        blk = swpc_block_map.get(t)
+                        if not blk and t.startswith('SWPC:'):
+                            # Fallback to parse token directly
                             try:
-                                alert_msg = await channel.send(alert_text)
-                                asyncio.create_task(_auto_delete(alert_msg, ALERT_DELETE_AFTER_MINUTES))
+                                _, ts_str, kp_str = t.split(':', 2)
+                                blk = {'ts': int(float(ts_str)), 'kp': float(kp_str)}
                             except Exception:
-                                logging.exception("Failed to send high-Kp alert message")
-                    await set_last_window(guild.id, combined_id, ts_now)
-        except Exception as e:
-            logging.exception(f"Update failed for guild {guild.id}: {e}")
+                                blk = None
+                        if not isinstance(blk, dict):
+                            continue
+                        ts_val = blk.get('ts') if isinstance(blk.get('ts'), int) else None
+                        kp_val = blk.get('kp') if isinstance(blk.get('kp'), (int, float)) else None
+                        if ts_val is None or kp_val is None:
+                            continue
+                        kind = blk.get('kind') if isinstance(blk.get('kind'), str) else ''
+                        kind_note = ' (est)' if kind == 'estimated' else ''
+                        alert_lines.append(f"SWPC Planetary Kp {kp_val:.2f}{kind_note} at <t:{ts_val}:t>")
+                    if alert_lines:
+                        threshold_display = engine.kp_threshold if engine else DEFAULT_KP
+                        alert_parts: List[str] = [f"⚠️ High Kp detected (≥ {threshold_display})"]
+                        if build and build.aggregated_sources_line:
+                            alert_parts.append(build.aggregated_sources_line)
+
+                        # Pull the best viewing windows (sorted by visibility) for quick reading
+                        window_lines: List[str] = []
+                        if build and build.detections:
+                            top = sorted(build.detections, key=lambda d: d.visibility_pct, reverse=True)[:3]
+                            for det in top:
+                                window_lines.append(
+                                    f"<t:{det.start_ts}:t>-<t:{det.end_ts}:t> • KP {det.kp:.2f} • 👀 {det.visibility_pct}%"
+                                )
+                        else:
+                            # Fallback to the raw SWPC alert tokens if no detections are present
+                            window_lines = [str(x) for x in alert_lines if isinstance(x, str)][:3]
+
+                        if window_lines:
+                            alert_parts.append("Best windows:")
+                            alert_parts.extend(window_lines)
+
+                        if tonight_url:
+                            alert_parts.append(f"Tonight image: {_cache_bust(tonight_url, ts_now)}")
+                        if tomorrow_url and tomorrow_url != tonight_url:
+                            alert_parts.append(f"Tomorrow image: {_cache_bust(tomorrow_url, ts_now)}")
+
+                        alert_parts.append(f"_(Will auto-delete in {ALERT_DELETE_AFTER_MINUTES} min)_")
+                        alert_text = "\n".join(alert_parts)
+                        try:
+                            alert_msg = await channel.send(alert_text)
+                            asyncio.create_task(_auto_delete(alert_msg, ALERT_DELETE_AFTER_MINUTES))
+                        except Exception:
+                            logger.exception("Failed to send high-Kp alert message")
+                await set_last_window(guild.id, combined_id, ts_now)
+    except Exception as e:
+        logger.exception("Update failed for guild %s: %s", guild.id, e)
+
+@tasks.loop(hours=UPDATE_INTERVAL_HOURS)
+async def updater():
+    await bot.wait_until_ready()
+    # Guilds sharing a location and threshold get identical builds; compute each distinct one once per cycle
+    builds: dict = {}
+    # Guild updates mostly wait on Discord and the forecast sources, so run them concurrently up to a small cap
+    sem = asyncio.Semaphore(UPDATER_CONCURRENCY)
+
+    async def _bounded(guild: discord.Guild) -> None:
+        async with sem:
+            await _update_guild(guild, builds)
+
+    await asyncio.gather(*(_bounded(guild) for guild in bot.guilds))
 
 if __name__ == '__main__':
     import argparse
@@ -893,9 +1001,9 @@ if __name__ == '__main__':
             # Kp Forecasts (by date with bullets)
             if build.detection_groups:
                 print('\nKp Forecasts:')
-                for date_label in sorted(build.detection_groups.keys()):
+                for date_label, bullets in build.detection_groups.items():
                     print(date_label)
-                    for bullet in build.detection_groups[date_label]:
+                    for bullet in bullets:
                         print(bullet)
             else:
                 print(f"\nKp Forecasts:\nNo high Kp forecasts \u2265 {engine.kp_threshold} in the next 3 days.")
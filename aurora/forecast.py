@@ -1,16 +1,31 @@
 from __future__ import annotations
 import os
-import re
 import json
+import atexit
+import time
+import tempfile
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone, date
+from functools import cached_property, lru_cache
 import math
-from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import pytz
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import cloudscraper  # type: ignore
+except ImportError:  # optional; AFM requests fall back to the plain shared session
+    cloudscraper = None
+
 
 @dataclass
 class GFZRecord:
@@ -73,12 +88,163 @@ KP_EQ_BOUNDARY = [
     (9.0, 51.0),
 ]
 
+MONTH_ABBRS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+MONTH_NUMBERS = {abbr: num for num, abbr in enumerate(MONTH_ABBRS, 1)}
+GFZ_STATUS_LABELS = {'pre': 'Preliminary', 'def': 'Definitive', 'now': 'Nowcast'}
+# Lower-cased payload keys searched in My Aurora Forecast responses
+MAF_PROB_KEYS = frozenset({'chance', 'probability', 'visibility', 'aurora_probability'})
+MAF_KP_KEYS = frozenset({'currentkp', 'kp', 'kp_index', 'kp current', 'kp_current'})
+MAF_SUMMARY_KP_KEYS = frozenset({'kp', 'kp_index', 'kp_current'})
+MAF_CLOUD_KEYS = frozenset({'cloud_cover', 'clouds', 'cloud'})
+DEFAULT_USER_AGENT = "AuroraAlertsBot/1.0 (+https://github.com/Ne-k/Aurora-Alerts)"
+KP_SECTION_START = "NOAA Kp index breakdown"
+KP_SECTION_END = ("Rationale:", "B. NOAA", "C. NOAA")
+# (issued_year, day_labels, rows) where rows are (interval, Kp values)
+KpTable = Tuple[Optional[int], List[str], List[Tuple[str, array]]]
+
+# Parsed JSON state files: path -> ((mtime_ns, size), data). Files are only re-parsed after they change on disk.
+_JSON_FILE_CACHE: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
+
+def _load_json_file(path: str) -> Optional[dict]:
+    """Load a small JSON state file, skipping the parse when its mtime and size are unchanged."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _JSON_FILE_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        # Shallow copy so callers can update counters without touching the cached parse
+        return dict(cached[1])
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if isinstance(data, dict):
+        _JSON_FILE_CACHE[path] = (stamp, data)
+        return dict(data)
+    return data
+
+
+def _save_json_file(path: str, obj: dict) -> None:
+    """Atomically replace a JSON state file and prime the parse cache with what was written."""
+    tmp_path = None
+    try:
+        # Write beside the target so os.replace stays a same-filesystem rename; a crash never leaves a truncated file
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.json', dir=os.path.dirname(path) or '.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(obj, f)
+        os.replace(tmp_path, path)
+        tmp_path = None
+        st = os.stat(path)
+        _JSON_FILE_CACHE[path] = ((st.st_mtime_ns, st.st_size), dict(obj))
+    except Exception:
+        pass
+    finally:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+# Last NOAA forecast body and validators, kept across restarts so the first poll can still be a 304
+FORECAST_CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'noaa_forecast_cache.json'))
+
+# Open-Meteo cloud cover and the AFM snapshot change at most every ~30 min; results are shared by every engine
+SOURCE_CACHE_TTL_SECONDS = 1800
+_SOURCE_CACHE: Dict[tuple, Tuple[float, object]] = {}
+# Parallel fetches inside build_alert and concurrent guild builds all read and write the cache
+_SOURCE_CACHE_LOCK = threading.Lock()
+
+
+def _source_cache_get(key: tuple) -> Optional[object]:
+    with _SOURCE_CACHE_LOCK:
+        entry = _SOURCE_CACHE.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _source_cache_put(key: tuple, value: object) -> None:
+    now = time.monotonic()
+    with _SOURCE_CACHE_LOCK:
+        if len(_SOURCE_CACHE) >= 64:
+            # Bounded by the number of configured locations; drop anything already expired
+            for stale in [k for k, (expires, _) in _SOURCE_CACHE.items() if expires <= now]:
+                _SOURCE_CACHE.pop(stale, None)
+        _SOURCE_CACHE[key] = (now + SOURCE_CACHE_TTL_SECONDS, value)
+
+
+@lru_cache(maxsize=1)
+def _shared_session() -> requests.Session:
+    """Process-wide HTTP session; the bot builds an engine per guild, so pooling per engine never reuses a connection."""
+    session = requests.Session()
+    # Identify the bot to upstream APIs; per-request headers (GFZ, AFM, MAF) still override this
+    session.headers['User-Agent'] = DEFAULT_USER_AGENT
+    # Transient upstream failures are retried with a short backoff; idempotent methods only (urllib3 default).
+    # Read timeouts are not retried (a hung host would hold a fetch for several full timeouts), and neither is 429:
+    # rate limits are left to the caller rather than hammered. Retry-After is ignored because urllib3 sleeps for it
+    # uncapped and outside the request timeout, which could stall a build.
+    retry = Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+    # Startup health checks hit services.swpc.noaa.gov several times concurrently, so allow a deeper per-host pool
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=16, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    atexit.register(session.close)
+    return session
+
+
+@lru_cache(maxsize=1)
+def _shared_scraper():
+    """Process-wide cloudscraper session for auroraforecast.me, or None when cloudscraper is unavailable."""
+    if cloudscraper is None:
+        return None
+    try:
+        return cloudscraper.create_scraper()
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _combine_percents(pairs: Tuple[Tuple[Optional[int], float], ...]) -> Optional[int]:
+    """Weighted mean of the integer percents in `pairs`, ignoring missing values."""
+    total = 0.0
+    wsum = 0.0
+    for val, w in pairs:
+        if isinstance(val, int):
+            total += max(0, min(100, val)) * w
+            wsum += w
+    if wsum <= 0:
+        return None
+    return int(round(total / wsum))
+
 
 class ForecastEngine:
     """
     Extracts NOAA Kp windows, enriches with clouds and AFM, and builds a message string.
     This class does NOT talk to Discord. Callers can format into embeds as desired.
     """
+    # Last parsed NOAA Kp table keyed by its source text; class-level because the bot builds an engine per guild
+    _kp_table_cache: Optional[Tuple[str, Optional[KpTable]]] = None
+    # Last NOAA forecast body with its validators: (url, Last-Modified, ETag, text, fresh-until monotonic time)
+    _forecast_cache: Optional[Tuple[str, Optional[str], Optional[str], str, float]] = None
+    FORECAST_FRESH_SECONDS = 300
+
+    # Static pieces of the rendered message
+    MESSAGE_HEADER = "🌌 **AURORA UPDATE**\n\n"
+    DASHBOARD_LINE = "[Aurora Dashboard](https://www.swpc.noaa.gov/communities/aurora-dashboard-experimental)\n"
+    AFM_HEADER = "\n**AuroraForecast.me**\n"
+    NO_WINDOWS_LINE = "\nNo high Kp windows currently at or above your threshold.\n"
+
     def __init__(self,
                  kp_threshold: float = 6.5,
                  latitude: float = 45.5152,
@@ -103,29 +269,77 @@ class ForecastEngine:
         self.gfz_json_base = base_candidate if base_candidate.endswith('/') else f"{base_candidate}/"
         # Retain attribute name for backwards compatibility / debugging
         self.gfz_api_url = self.gfz_json_base
-
-    def fetch_forecast(self) -> str:
-        r = requests.get(self.url, timeout=20)
+        # Keep-alive connection pool shared by every engine in the process
+        self.session = _shared_session()
+
+    @cached_property
+    def local_tz(self) -> ZoneInfo:
+        """Engine timezone, resolved on first use and reused afterwards."""
+        return ZoneInfo(self.timezone_name)
+
+    def fetch_forecast(self, use_cache: bool = True) -> str:
+        # Conditional GET: SWPC revises the text every few hours, so most polls can be answered with a 304
+        # Within FORECAST_FRESH_SECONDS of the last response, skip the network entirely (unless use_cache is False)
+        cached = ForecastEngine._forecast_cache
+        if cached is None:
+            stored = _load_json_file(FORECAST_CACHE_PATH)
+            if stored and isinstance(stored.get('text'), str):
+                # Restored validators are revalidated on the first poll rather than trusted as fresh
+                cached = (stored.get('url'), stored.get('last_modified'), stored.get('etag'), stored['text'], 0.0)
+        headers: Dict[str, str] = {}
+        if cached is not None and cached[0] == self.url:
+            if use_cache and time.monotonic() < cached[4]:
+                return cached[3]
+            if cached[1]:
+                headers['If-Modified-Since'] = cached[1]
+            if cached[2]:
+                headers['If-None-Match'] = cached[2]
+        r = self.session.get(self.url, headers=headers or None, timeout=20)
+        fresh_until = time.monotonic() + self.FORECAST_FRESH_SECONDS
+        if r.status_code == 304 and cached is not None and headers:
+            ForecastEngine._forecast_cache = cached[:4] + (fresh_until,)
+            return cached[3]
         r.raise_for_status()
-        return r.text
-
-    def fetch_cloud_cover(self) -> Dict[datetime, int]:
+        text = r.text
+        last_modified = r.headers.get('Last-Modified')
+        etag = r.headers.get('ETag')
+        ForecastEngine._forecast_cache = (self.url, last_modified, etag, text, fresh_until)
+        if last_modified or etag:
+            try:
+                os.makedirs(os.path.dirname(FORECAST_CACHE_PATH), exist_ok=True)
+                _save_json_file(FORECAST_CACHE_PATH, {
+                    'url': self.url,
+                    'last_modified': last_modified,
+                    'etag': etag,
+                    'text': text,
+                })
+            except Exception:
+                pass
+        return text
+
+    def fetch_cloud_cover(self, use_cache: bool = True) -> Dict[datetime, int]:
+        # use_cache=False always hits Open-Meteo (health checks); a fresh result still refreshes the cache
+        cache_key = ('cloud_cover', round(self.latitude, 4), round(self.longitude, 4))
+        cached = _source_cache_get(cache_key) if use_cache else None
+        if cached is not None:
+            return cached  # type: ignore[return-value]
         base = "https://api.open-meteo.com/v1/forecast"
         params = (
             f"latitude={self.latitude}&longitude={self.longitude}&hourly=cloudcover&timezone=UTC&forecast_days=3"
+            "&timeformat=unixtime"
         )
         url = f"{base}?{params}"
         data: Dict[datetime, int] = {}
         try:
-            r = requests.get(url, timeout=15)
+            r = self.session.get(url, timeout=15)
             r.raise_for_status()
             j = r.json()
             hours = j.get('hourly', {}).get('time', [])
             cover = j.get('hourly', {}).get('cloudcover', [])
-            for t_str, cc in zip(hours, cover):
+            # Unix seconds from Open-Meteo map straight to aware UTC datetimes, no ISO string parsing
+            for ts, cc in zip(hours, cover):
                 try:
-                    dt = datetime.fromisoformat(t_str.replace('Z', '+00:00')).astimezone(timezone.utc)
-                    data[dt] = int(cc)
+                    data[datetime.fromtimestamp(ts, tz=timezone.utc)] = int(cc)
                 except Exception:
                     continue
         except Exception:
@@ -138,6 +352,8 @@ class ForecastEngine:
                     data = ow
             except Exception:
                 pass
+        if data:
+            _source_cache_put(cache_key, data)
         return data
 
     def fetch_cloud_cover_openweather(self) -> Dict[datetime, int]:
@@ -166,29 +382,15 @@ class ForecastEngine:
             data_dir, f"ow_cache_{round(self.latitude,2)}_{round(self.longitude,2)}.json"
         )
 
-        def _load_json(p: str) -> Optional[dict]:
-            try:
-                with open(p, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                return None
-
-        def _save_json(p: str, obj: dict) -> None:
-            try:
-                with open(p, 'w', encoding='utf-8') as f:
-                    json.dump(obj, f)
-            except Exception:
-                pass
-
         out: Dict[datetime, int] = {}
         now = datetime.now(timezone.utc)
         today = now.date().isoformat()
-        usage = _load_json(usage_path) or {}
+        usage = _load_json_file(usage_path) or {}
         if usage.get('date') != today:
             usage = {'date': today, 'count': 0, 'last_call_ts': 0}
 
         # Try cache first if fresh
-        cache = _load_json(cache_path) or {}
+        cache = _load_json_file(cache_path) or {}
         fetched_ts = cache.get('fetched_ts')
         if isinstance(fetched_ts, int):
             age_min = int((now.timestamp() - fetched_ts) / 60)
@@ -217,7 +419,7 @@ class ForecastEngine:
                 f"https://api.openweathermap.org/data/3.0/onecall?lat={self.latitude}&lon={self.longitude}"
                 f"&exclude=minutely,daily,alerts,current&appid={api_key}&units=metric"
             )
-            r = requests.get(url, timeout=15)
+            r = self.session.get(url, timeout=15)
             if r.status_code == 200:
                 j = r.json()
                 for h in j.get('hourly', []) or []:
@@ -231,8 +433,8 @@ class ForecastEngine:
                 if out:
                     usage['count'] = int(usage.get('count', 0)) + 1
                     usage['last_call_ts'] = int(now.timestamp())
-                    _save_json(usage_path, usage)
-                    _save_json(cache_path, {
+                    _save_json_file(usage_path, usage)
+                    _save_json_file(cache_path, {
                         'lat': self.latitude,
                         'lon': self.longitude,
                         'fetched_ts': int(now.timestamp()),
@@ -248,7 +450,7 @@ class ForecastEngine:
                 f"https://api.openweathermap.org/data/2.5/forecast?lat={self.latitude}&lon={self.longitude}"
                 f"&appid={api_key}&units=metric"
             )
-            r = requests.get(url, timeout=15)
+            r = self.session.get(url, timeout=15)
             if r.status_code == 200:
                 j = r.json()
                 for it in j.get('list', []) or []:
@@ -265,8 +467,8 @@ class ForecastEngine:
                 if out:
                     usage['count'] = int(usage.get('count', 0)) + 1
                     usage['last_call_ts'] = int(now.timestamp())
-                    _save_json(usage_path, usage)
-                    _save_json(cache_path, {
+                    _save_json_file(usage_path, usage)
+                    _save_json_file(cache_path, {
                         'lat': self.latitude,
                         'lon': self.longitude,
                         'fetched_ts': int(now.timestamp()),
@@ -283,7 +485,7 @@ class ForecastEngine:
         """
         url = "https://services.swpc.noaa.gov/json/ovation_aurora_latest.json"
         try:
-            r = requests.get(url, timeout=15)
+            r = self.session.get(url, timeout=15)
             r.raise_for_status()
             j = r.json()
             candidates: List[Tuple[float, float, float]] = []  # (lat, lon, prob)
@@ -371,7 +573,7 @@ class ForecastEngine:
         }
         try:
             # Explicitly disable proxies (disregard any proxy settings)
-            r = requests.post(url, headers=headers, data=data, timeout=20, proxies={})
+            r = self.session.post(url, headers=headers, data=data, timeout=20, proxies={})
             r.raise_for_status()
             # First try direct JSON
             try:
@@ -407,10 +609,10 @@ class ForecastEngine:
         if status:
             params['status'] = status
         headers = {
-            'User-Agent': os.getenv('GFZ_USER_AGENT', 'AuroraAlertsBot/1.0 (+https://github.com/Ne-k/Aurora-Alerts)')
+            'User-Agent': os.getenv('GFZ_USER_AGENT', DEFAULT_USER_AGENT)
         }
         try:
-            r = requests.get(base_url, params=params, timeout=20, headers=headers)
+            r = self.session.get(base_url, params=params, timeout=20, headers=headers)
             r.raise_for_status()
             payload = r.json()
         except Exception:
@@ -448,14 +650,9 @@ class ForecastEngine:
     def _gfz_status_label(code: str) -> str:
         if not code:
             return "Unspecified"
-        mapping = {
-            'pre': 'Preliminary',
-            'def': 'Definitive',
-            'now': 'Nowcast',
-        }
-        lower = code.lower()
-        if lower in mapping:
-            return mapping[lower]
+        label = GFZ_STATUS_LABELS.get(code.lower())
+        if label is not None:
+            return label
         return code.upper() if len(code) <= 4 else code
 
     def _latitude_factor(self, kp_value: float) -> float:
@@ -489,7 +686,7 @@ class ForecastEngine:
         end = datetime.now(timezone.utc)
         start = end - timedelta(hours=hours_window)
         records, meta = self.fetch_gfz_series(start, end)
-        local_tz = pytz.timezone(self.timezone_name)
+        local_tz = self.local_tz
         rows = []
         for rec in records:
             ts = int(rec.timestamp.timestamp())
@@ -499,7 +696,8 @@ class ForecastEngine:
                 'kp': round(rec.value, 3),
                 'status': rec.status,
                 'status_label': self._gfz_status_label(rec.status),
-                'local_label': local_dt.strftime('%b %d %H:%M'),
+                # Same text as strftime('%b %d %H:%M') without interpreting a format string per row
+                'local_label': f"{MONTH_ABBRS[local_dt.month - 1]} {local_dt.day:02d} {local_dt.hour:02d}:{local_dt.minute:02d}",
             })
         latest = rows[-1] if rows else None
         source_note = None
@@ -524,7 +722,7 @@ class ForecastEngine:
     def fetch_swpc_planetary_k_latest(self) -> Tuple[Optional[dict], List[dict]]:
         url = "https://services.swpc.noaa.gov/json/planetary_k_index_1m.json"
         try:
-            r = requests.get(url, timeout=15)
+            r = self.session.get(url, timeout=15)
             r.raise_for_status()
             data = r.json()
         except Exception:
@@ -584,7 +782,7 @@ class ForecastEngine:
         text_url = "https://services.swpc.noaa.gov/text/aurora-nowcast-hemi-power.txt"
         latest: Optional[dict] = None
         try:
-            r = requests.get(text_url, timeout=15)
+            r = self.session.get(text_url, timeout=15)
             r.raise_for_status()
             for raw_line in r.text.splitlines():
                 line = raw_line.strip()
@@ -597,8 +795,9 @@ class ForecastEngine:
                 obs_str, fc_str = parts[0], parts[1]
                 north_str, south_str = parts[2], parts[3]
                 try:
-                    obs_dt = datetime.strptime(obs_str, "%Y-%m-%d_%H:%M").replace(tzinfo=timezone.utc)
-                    fc_dt = datetime.strptime(fc_str, "%Y-%m-%d_%H:%M").replace(tzinfo=timezone.utc)
+                    # YYYY-MM-DD_HH:MM is ISO once the separator is swapped; parse straight to an aware UTC datetime
+                    obs_dt = datetime.fromisoformat(obs_str.replace('_', 'T') + '+00:00')
+                    fc_dt = datetime.fromisoformat(fc_str.replace('_', 'T') + '+00:00')
                 except Exception:
                     continue
                 try:
@@ -682,7 +881,12 @@ class ForecastEngine:
         score = base * ovation_weight * maf_weight
         return max(0, min(100, int(round(100.0 * score))))
 
-    def fetch_aurora_snapshot(self, lat: float, lon: float) -> Optional[dict]:
+    def fetch_aurora_snapshot(self, lat: float, lon: float, use_cache: bool = True) -> Optional[dict]:
+        # use_cache=False always hits auroraforecast.me (health checks); a fresh result still refreshes the cache
+        cache_key = ('afm_snapshot', round(lat, 4), round(lon, 4))
+        cached = _source_cache_get(cache_key) if use_cache else None
+        if cached is not None:
+            return cached  # type: ignore[return-value]
         url = f"https://auroraforecast.me/api/seoSnapshot?lat={lat}&lon={lon}"
         headers = {
             'User-Agent': 'Mozilla/5.0',
@@ -690,14 +894,20 @@ class ForecastEngine:
             'Referer': 'https://auroraforecast.me/portland',
         }
         try:
-            try:
-                import cloudscraper  # type: ignore
-                scraper = cloudscraper.create_scraper()
-                r = scraper.get(url, headers=headers, timeout=15)
-            except Exception:
-                r = requests.get(url, headers=headers, timeout=15)
+            r = None
+            scraper = _shared_scraper()
+            if scraper is not None:
+                try:
+                    r = scraper.get(url, headers=headers, timeout=15)
+                except Exception:
+                    r = None
+            if r is None:
+                r = self.session.get(url, headers=headers, timeout=15)
             if r.status_code == 200:
-                return r.json()
+                snapshot = r.json()
+                if snapshot:
+                    _source_cache_put(cache_key, snapshot)
+                return snapshot
         except Exception:
             pass
         return None
@@ -706,12 +916,20 @@ class ForecastEngine:
         """Compute short-term viewing probability for the next `minutes` in `step`-minute increments."""
         now_utc = datetime.now(timezone.utc)
 
-        # Core data sources
-        maf = self.fetch_maf_data(self.latitude, self.longitude, self.timezone_name)
-        ovation_prob = self.fetch_ovation_probability(self.latitude, self.longitude)
-        clouds = self.fetch_cloud_cover()
-        snapshot = self.fetch_aurora_snapshot(self.latitude, self.longitude)
-        gfz_records, gfz_meta = self.fetch_gfz_series(now_utc - timedelta(hours=24), now_utc + timedelta(hours=3))
+        # Core data sources: seven independent round trips, overlapped as in build_alert
+        with ThreadPoolExecutor(max_workers=7) as pool:
+            maf_future = pool.submit(self.fetch_maf_data, self.latitude, self.longitude, self.timezone_name)
+            ovation_future = pool.submit(self.fetch_ovation_probability, self.latitude, self.longitude)
+            cloud_future = pool.submit(self.fetch_cloud_cover)
+            snapshot_future = pool.submit(self.fetch_aurora_snapshot, self.latitude, self.longitude)
+            gfz_future = pool.submit(self.fetch_gfz_series, now_utc - timedelta(hours=24), now_utc + timedelta(hours=3))
+            swpc_planetary_future = pool.submit(self.fetch_swpc_planetary_k_latest)
+            swpc_hemi_future = pool.submit(self.fetch_swpc_hemi_power)
+        maf = maf_future.result()
+        ovation_prob = ovation_future.result()
+        clouds = cloud_future.result()
+        snapshot = snapshot_future.result()
+        gfz_records, gfz_meta = gfz_future.result()
         gfz_latest = gfz_records[-1] if gfz_records else None
         gfz_latest_status = self._gfz_status_label(gfz_latest.status) if gfz_latest else None
         gfz_source_note = None
@@ -727,8 +945,8 @@ class ForecastEngine:
         if not gfz_source_note:
             gfz_source_note = 'GFZ German Research Centre for Geosciences (CC BY 4.0)'
 
-        swpc_planetary, swpc_high_blocks_recent = self.fetch_swpc_planetary_k_latest()
-        swpc_hemi = self.fetch_swpc_hemi_power()
+        swpc_planetary, swpc_high_blocks_recent = swpc_planetary_future.result()
+        swpc_hemi = swpc_hemi_future.result()
         swpc_kp_latest = None
         swpc_est_kp = None
         swpc_planetary_line = None
@@ -773,10 +991,10 @@ class ForecastEngine:
         maf_kp = None
         maf_prob = None
         if isinstance(maf, dict):
-            val = _find_num_nested(maf, ['currentkp', 'kp', 'kp_index', 'kp current', 'kp_current'])
+            val = _find_num_nested(maf, MAF_KP_KEYS)
             if isinstance(val, (int, float)):
                 maf_kp = float(val)
-            pval = _find_num_nested(maf, ['chance', 'probability', 'visibility', 'aurora_probability'])
+            pval = _find_num_nested(maf, MAF_PROB_KEYS)
             if isinstance(pval, (int, float)):
                 maf_prob = int(round(float(pval)))
 
@@ -803,20 +1021,19 @@ class ForecastEngine:
 
         kp_for_calc = maf_kp if isinstance(maf_kp, (int, float)) else max(self.kp_threshold, 5.0)
 
-        points = []
-        for delta_min in range(0, minutes + 1, step):
-            ts = int((now_utc + timedelta(minutes=delta_min)).timestamp())
-            prob = self.visibility_percent(
-                kp=kp_for_calc,
-                cloud_avg=cloud_now,
-                ovation_prob=ovation_prob,
-                sky_darkness=sky_darkness,
-                maf_prob=maf_prob,
-                gfz_kp=gfz_latest.value if gfz_latest else None,
-                swpc_kp=swpc_kp_latest if isinstance(swpc_kp_latest, (int, float)) else swpc_est_kp,
-                hemi_power=hemi_total,
-            )
-            points.append({'ts': ts, 'prob': prob})
+        # Every input to the score is a current reading, so the series is flat: score once and stamp each step
+        prob = self.visibility_percent(
+            kp=kp_for_calc,
+            cloud_avg=cloud_now,
+            ovation_prob=ovation_prob,
+            sky_darkness=sky_darkness,
+            maf_prob=maf_prob,
+            gfz_kp=gfz_latest.value if gfz_latest else None,
+            swpc_kp=swpc_kp_latest if isinstance(swpc_kp_latest, (int, float)) else swpc_est_kp,
+            hemi_power=hemi_total,
+        )
+        now_ts = int(now_utc.timestamp())
+        points = [{'ts': now_ts + delta_min * 60, 'prob': prob} for delta_min in range(0, minutes + 1, step)]
 
         return {
             'points': points,
@@ -835,81 +1052,117 @@ class ForecastEngine:
             'swpc_source_note': swpc_source_note,
         }
 
+    @staticmethod
+    def _parse_kp_table(forecast_text: str) -> Optional[KpTable]:
+        """Locate the Kp breakdown with literal scans and walk only its lines.
+        Returns (issued_year, day_labels, rows) where rows are (interval, kp values as array('d')),
+        or None if the Kp breakdown section is missing.
+        """
+        # A literal scan settles the missing-section case without splitting the document into lines
+        start = forecast_text.find(KP_SECTION_START)
+        if start == -1:
+            return None
+        issued_year: Optional[int] = None
+        idx = forecast_text.find(':Issued:')
+        while idx != -1:
+            eol = forecast_text.find('\n', idx)
+            year_tok = forecast_text[idx + 8:eol if eol != -1 else None].split(None, 1)
+            if year_tok and len(year_tok[0]) >= 4 and year_tok[0][:4].isdigit():
+                issued_year = int(year_tok[0][:4])
+                break
+            idx = forecast_text.find(':Issued:', idx + 8)
+        # Only the breakdown itself is split into lines; it ends at the first section marker after the header
+        ends = [pos for pos in (forecast_text.find(marker, start) for marker in KP_SECTION_END) if pos != -1]
+        section = forecast_text[start:min(ends)] if ends else forecast_text[start:]
+        strict_days: List[str] = []
+        loose_days: List[str] = []
+        rows: List[Tuple[str, array]] = []
+        for line in section.splitlines():
+            tokens = line.split()
+            if not tokens:
+                continue
+            first = tokens[0]
+            # Time rows look like "00-03UT   6.67 (G3)   3.67   2.67"
+            if len(first) == 7 and first.endswith('UT') and first[2] == '-' and first[:2].isdigit() and first[3:5].isdigit():
+                if len(tokens) > 1:
+                    values = array('d')
+                    for tok in tokens[1:]:
+                        num = tok.partition('(')[0]  # drop "(G3)" storm-scale annotations
+                        if num and num.replace('.', '', 1).isdigit():
+                            values.append(float(num))
+                    rows.append((first[:5], values))
+                continue
+            found = [
+                f"{tok} {nxt}"
+                for tok, nxt in zip(tokens, tokens[1:])
+                if tok in MONTH_NUMBERS and nxt.isdigit() and len(nxt) <= 2
+            ]
+            # Prefer a line holding exactly the three day headers; otherwise the first line with three dates
+            if not strict_days and len(found) == 3 and len(tokens) == 6:
+                strict_days = found
+            elif not loose_days and len(found) >= 3:
+                loose_days = found[:3]
+        return issued_year, strict_days or loose_days, rows
+
+    def _kp_table(self, forecast_text: str) -> Optional[KpTable]:
+        """Parse the Kp table, reusing the last result when the forecast text is unchanged."""
+        # Direct str comparison: identity short-circuits for the same object, otherwise a memcmp with no re-encode
+        cached = ForecastEngine._kp_table_cache
+        if cached is not None and cached[0] == forecast_text:
+            return cached[1]
+        parsed = self._parse_kp_table(forecast_text)
+        ForecastEngine._kp_table_cache = (forecast_text, parsed)
+        return parsed
+
     def build_alert(self, forecast_text: str, debug: bool = False) -> Optional[AlertBuild]:
-        # Extract Kp table section
-        kp_section_pattern = re.compile(
-            r'NOAA Kp index breakdown[\s\S]*?(?=Rationale:|B\. NOAA|C\. NOAA|$)',
-            re.DOTALL
-        )
-        kp_section_match = kp_section_pattern.search(forecast_text)
-        if not kp_section_match:
+        parsed = self._kp_table(forecast_text)
+        if parsed is None:
+            return None
+        issued_year_parsed, days, time_rows = parsed
+        if not days:
             return None
-        kp_section = kp_section_match.group()
-
-        # Day headers
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        months_pattern = "|".join(months)
-        header_match = re.search(
-            rf'^\s*((?:{months_pattern})\s+\d{{1,2}})\s+((?:{months_pattern})\s+\d{{1,2}})\s+((?:{months_pattern})\s+\d{{1,2}})\s*$',
-            kp_section,
-            flags=re.M
-        )
-        if header_match:
-            days = [header_match.group(1), header_match.group(2), header_match.group(3)]
-        else:
-            days = []
-            for line in kp_section.splitlines():
-                found = re.findall(rf'(?:{months_pattern})\s+\d{{1,2}}', line)
-                if len(found) >= 3:
-                    days = found[:3]
-                    break
-            if not days:
-                return None
-        days = [d.strip() for d in days][:3]
 
-        issued_year_match = re.search(r':Issued:\s+(\d{4})', forecast_text)
-        try:
-            issued_year = int(issued_year_match.group(1)) if issued_year_match else datetime.now(timezone.utc).year
-        except Exception:
-            issued_year = datetime.now(timezone.utc).year
-        day_dates = [datetime.strptime(f"{issued_year} {d}", "%Y %b %d").date() for d in days]
+        # One clock read for the whole build: issued-year fallback, enrichment windows and the "tonight" horizon
+        now_utc = datetime.now(timezone.utc)
+        issued_year = issued_year_parsed if issued_year_parsed is not None else now_utc.year
+        # Day labels are already validated "Mon DD" pairs; map them directly instead of running strptime
+        day_dates = []
+        for d in days:
+            mon, day_num = d.split()
+            day_dates.append(date(issued_year, MONTH_NUMBERS[mon], int(day_num)))
 
-        time_rows = re.findall(r'^\s*(\d{2}-\d{2})UT\s+([^\n]+)$', kp_section, flags=re.M)
         if len(time_rows) < 8:
             return None
 
         # Build full localized forecast lines (all values regardless of threshold)
         all_forecast_lines: List[str] = []
-        if days:
-            # Midnight UTC timestamps for Discord localized date display (<t:ts:D>)
-            midnight_ts = []
-            for d in day_dates:
-                dt_mid = datetime(d.year, d.month, d.day, 0, 0, tzinfo=timezone.utc)
-                midnight_ts.append(int(dt_mid.timestamp()))
-            header = f"Dates: <t:{midnight_ts[0]}:D> | <t:{midnight_ts[1]}:D> | <t:{midnight_ts[2]}:D>"
-            all_forecast_lines.append(header)
-        for interval, rest in time_rows:
-            rest_clean_full = re.sub(r'\s*\(G\d+\)', '', rest)
-            vals_full = re.findall(r'(\d+(?:\.\d+)?)', rest_clean_full)
+        # Midnight UTC timestamps for Discord localized date display (<t:ts:D>); days is non-empty here
+        midnight_ts = []
+        for d in day_dates:
+            dt_mid = datetime(d.year, d.month, d.day, 0, 0, tzinfo=timezone.utc)
+            midnight_ts.append(int(dt_mid.timestamp()))
+        header = f"Dates: <t:{midnight_ts[0]}:D> | <t:{midnight_ts[1]}:D> | <t:{midnight_ts[2]}:D>"
+        all_forecast_lines.append(header)
+        # One pass over the table renders each row and collects its above-threshold cells:
+        # (day_label, day_date, interval, kp, start_hour, end_hour)
+        above_info: List[Tuple[str, date, str, float, int, int]] = []
+        threshold = self.kp_threshold
+        for interval, vals_full in time_rows:
             if len(vals_full) < 3:
                 continue
-            start_hour = int(interval.split('-')[0])
-            # Build per-day timestamp labels for start of block
-            ts_labels: List[str] = []
-            for d in day_dates:
-                block_start = datetime(d.year, d.month, d.day, start_hour, 0, tzinfo=timezone.utc)
-                ts_labels.append(f"<t:{int(block_start.timestamp())}:t>")
+            start_str, end_str = interval.split('-', 1)
+            start_hour = int(start_str)
+            # Build per-day timestamp labels for start of block (UTC midnight + whole hours, no datetime per cell)
+            block_offset = start_hour * 3600
+            ts_labels = [f"<t:{mid_ts + block_offset}:t>" for mid_ts in midnight_ts]
             formatted_vals = []
             for i in range(3):
-                raw = vals_full[i]
-                try:
-                    v = float(raw)
-                    val_disp = f"{v:.2f}"
-                    if v >= self.kp_threshold:
-                        val_disp = f"**{val_disp}**"
-                    formatted_vals.append(val_disp)
-                except Exception:
-                    formatted_vals.append(raw)
+                v = vals_full[i]
+                val_disp = f"{v:.2f}"
+                if v >= threshold:
+                    val_disp = f"**{val_disp}**"
+                    above_info.append((days[i], day_dates[i], interval, v, start_hour, int(end_str)))
+                formatted_vals.append(val_disp)
             # Compose line with localized time for each day's block start + value
             # Example: 00-03UT: <t:...:t> 8.00 | <t:...:t> 4.67 | <t:...:t> 2.33
             line = (
@@ -920,22 +1173,16 @@ class ForecastEngine:
             )
             all_forecast_lines.append(line)
 
-        above_info: List[Tuple[str, date, str, float]] = []
-        for interval, rest in time_rows:
-            rest_clean = re.sub(r'\s*\(G\d+\)', '', rest)
-            values = re.findall(r'(\d+(?:\.\d+)?)', rest_clean)
-            if len(values) < 3:
-                continue
-            for col_idx, day_label in enumerate(days):
-                try:
-                    kp = float(values[col_idx])
-                except ValueError:
-                    continue
-                if kp >= self.kp_threshold:
-                    above_info.append((day_label, day_dates[col_idx], f"{interval}UT", kp))
-
-        now_utc = datetime.now(timezone.utc)
-        gfz_records, gfz_meta = self.fetch_gfz_series(now_utc - timedelta(hours=36), now_utc + timedelta(hours=3))
+        # The enrichment sources are independent; overlap their round trips instead of running them back to back
+        with ThreadPoolExecutor(max_workers=7) as pool:
+            gfz_future = pool.submit(self.fetch_gfz_series, now_utc - timedelta(hours=36), now_utc + timedelta(hours=3))
+            swpc_planetary_future = pool.submit(self.fetch_swpc_planetary_k_latest)
+            swpc_hemi_future = pool.submit(self.fetch_swpc_hemi_power)
+            cloud_future = pool.submit(self.fetch_cloud_cover)
+            snapshot_future = pool.submit(self.fetch_aurora_snapshot, self.latitude, self.longitude)
+            ovation_future = pool.submit(self.fetch_ovation_probability, self.latitude, self.longitude)
+            maf_future = pool.submit(self.fetch_maf_data, self.latitude, self.longitude, self.timezone_name)
+        gfz_records, gfz_meta = gfz_future.result()
         gfz_summary_lines: List[str] = []
         gfz_latest_line: Optional[str] = None
         gfz_source_note: Optional[str] = None
@@ -975,8 +1222,8 @@ class ForecastEngine:
         if not gfz_source_note:
             gfz_source_note = 'GFZ German Research Centre for Geosciences (CC BY 4.0)'
 
-        swpc_planetary, swpc_high_blocks_recent = self.fetch_swpc_planetary_k_latest()
-        swpc_hemi = self.fetch_swpc_hemi_power()
+        swpc_planetary, swpc_high_blocks_recent = swpc_planetary_future.result()
+        swpc_hemi = swpc_hemi_future.result()
         swpc_planetary_line = None
         swpc_summary_lines: List[str] = []
         swpc_kp_latest = None
@@ -1023,9 +1270,13 @@ class ForecastEngine:
             above_info = []  # keep empty; embed will show placeholder later
 
         # Enrich
-        cloud_map = self.fetch_cloud_cover()
+        cloud_map = cloud_future.result()
         cloud_available = bool(cloud_map)
-        snapshot = self.fetch_aurora_snapshot(self.latitude, self.longitude)
+        # Sorted (unix ts, cover) columns so each detection window is two bisects instead of a full map scan
+        cloud_points = sorted((int(t.timestamp()), int(v)) for t, v in cloud_map.items() if v is not None) if cloud_available else []
+        cloud_ts = [ts for ts, _ in cloud_points]
+        cloud_vals = [v for _, v in cloud_points]
+        snapshot = snapshot_future.result()
         sky_darkness = None
         if snapshot:
             try:
@@ -1033,11 +1284,11 @@ class ForecastEngine:
             except Exception:
                 sky_darkness = None
         # NOAA Ovation nowcast probability at location
-        ovation_prob = self.fetch_ovation_probability(self.latitude, self.longitude)
+        ovation_prob = ovation_future.result()
         # My Aurora Forecast data
-        maf = self.fetch_maf_data(self.latitude, self.longitude, self.timezone_name)
+        maf = maf_future.result()
         maf_prob: Optional[int] = None
-        def find_num_nested(obj, keys: List[str]) -> Optional[float]:
+        def find_num_nested(obj, keys: FrozenSet[str]) -> Optional[float]:
             try:
                 if isinstance(obj, dict):
                     for k, v in obj.items():
@@ -1055,64 +1306,40 @@ class ForecastEngine:
             except Exception:
                 return None
             return None
+        maf_prob_raw: Optional[float] = None
         if maf and isinstance(maf, dict):
             # try several common probability keys anywhere in the payload
-            res = find_num_nested(maf, ['chance','probability','visibility','aurora_probability'])
-            if isinstance(res, (int, float)):
-                maf_prob = int(round(res))
+            maf_prob_raw = find_num_nested(maf, MAF_PROB_KEYS)
+            if isinstance(maf_prob_raw, (int, float)):
+                maf_prob = int(round(maf_prob_raw))
 
         # Sort and compute per detection structures
-        try:
-            above_info.sort(key=lambda x: (x[1], int(x[2].split('-')[0])))
-        except Exception:
-            pass
+        above_info.sort(key=lambda x: (x[1], x[4]))
 
+        # Per-day UTC midnights were computed once for the table header; windows are whole-hour offsets from them
+        midnight_ts_by_date = dict(zip(day_dates, midnight_ts))
         detections: List[Detection] = []  # retained for embed display (forecast windows)
-        utc = pytz.utc
-        local_tz = pytz.timezone('America/Los_Angeles')
-        for day_label, day_date, time_block, kp in above_info:
-            start_hour = int(time_block.split('-')[0])
-            end_hour = int(time_block.split('-')[1][:2])
-            start_time_utc = utc.localize(datetime(day_date.year, day_date.month, day_date.day, start_hour, 0))
-            end_time_utc = utc.localize(datetime(day_date.year, day_date.month, day_date.day, end_hour, 0))
-            if end_hour <= start_hour:
-                end_time_utc = end_time_utc + timedelta(days=1)
-            start_ts = int(start_time_utc.timestamp())
-            end_ts = int(end_time_utc.timestamp())
+        for day_label, day_date, interval, kp, start_hour, end_hour in above_info:
+            time_block = f"{interval}UT"
+            day_midnight_ts = midnight_ts_by_date[day_date]
+            start_ts = day_midnight_ts + start_hour * 3600
+            # Blocks like 21-00UT end on the next day; the modulo covers the wrap without a branch
+            end_ts = start_ts + ((end_hour - start_hour) % 24 or 24) * 3600
             # cloud avg
             cloud_avg_display = "N/A"
             vis_pct = 0
             if cloud_available:
                 # Collect any cloud entries that fall within the window (works for 1h and 3h steps)
-                values = []
-                try:
-                    for t, v in cloud_map.items():
-                        if v is None:
-                            continue
-                        if start_time_utc <= t < end_time_utc:
-                            values.append(int(v))
-                except Exception:
-                    values = []
+                values = cloud_vals[bisect_left(cloud_ts, start_ts):bisect_left(cloud_ts, end_ts)]
                 if values:
                     avg = sum(values) / float(len(values))
                     cloud_avg_display = f"{avg:.0f}%"
                     vis_pct = self.visibility_percent(kp, avg, ovation_prob=ovation_prob, sky_darkness=sky_darkness, maf_prob=maf_prob, gfz_kp=gfz_latest_value, swpc_kp=swpc_effective_kp, hemi_power=hemi_total)
                 else:
                     # No datapoints fell inside the window; try nearest neighbor at start or end within +/- 180 minutes
-                    nearest_vals = []
-                    for t, v in cloud_map.items():
-                        if v is None:
-                            continue
-                        dtmin = abs((t - start_time_utc).total_seconds()) / 60.0
-                        if dtmin <= 180:
-                            nearest_vals.append(int(v))
+                    nearest_vals = cloud_vals[bisect_left(cloud_ts, start_ts - 10800):bisect_right(cloud_ts, start_ts + 10800)]
                     if not nearest_vals:
-                        for t, v in cloud_map.items():
-                            if v is None:
-                                continue
-                            dtmin = abs((t - end_time_utc).total_seconds()) / 60.0
-                            if dtmin <= 180:
-                                nearest_vals.append(int(v))
+                        nearest_vals = cloud_vals[bisect_left(cloud_ts, end_ts - 10800):bisect_right(cloud_ts, end_ts + 10800)]
                     if nearest_vals:
                         avg = sum(nearest_vals) / float(len(nearest_vals))
                         cloud_avg_display = f"{avg:.0f}%"
@@ -1128,7 +1355,7 @@ class ForecastEngine:
                             for t, v in ow_map.items():
                                 if v is None:
                                     continue
-                                if start_time_utc <= t < end_time_utc:
+                                if start_ts <= t.timestamp() < end_ts:
                                     ow_vals.append(int(v))
                         if ow_vals:
                             avg = sum(ow_vals) / float(len(ow_vals))
@@ -1140,14 +1367,8 @@ class ForecastEngine:
                 vis_pct = self.visibility_percent(kp, None, ovation_prob=ovation_prob, sky_darkness=sky_darkness, maf_prob=maf_prob, gfz_kp=gfz_latest_value, swpc_kp=swpc_effective_kp, hemi_power=hemi_total)
             local_date_label = f"<t:{start_ts}:D>"
             # Build bullet with UT block label and localized Discord timestamps for the time range
-            ut_label = time_block
-            try:
-                if ut_label.endswith('UT') and not ut_label.endswith(' UT'):
-                    ut_label = ut_label[:-2] + ' UT'
-            except Exception:
-                pass
             bullet = (
-                f"• {ut_label} → <t:{start_ts}:t> - <t:{end_ts}:t> • "
+                f"• {interval} UT → <t:{start_ts}:t> - <t:{end_ts}:t> • "
                 f"KP {kp:.2f} • ☁️ {cloud_avg_display} • 👀 {vis_pct}%"
             )
             detections.append(Detection(day_label, day_date, time_block, kp, start_ts, end_ts, cloud_avg_display, vis_pct, local_date_label, bullet))
@@ -1157,11 +1378,10 @@ class ForecastEngine:
         maf_summary = None
         if maf and isinstance(maf, dict):
             # attempt to find a few useful indicators across the whole payload
-            def first_num_any(obj, keys: List[str]) -> Optional[float]:
-                return find_num_nested(obj, [k.lower() for k in keys])
-            maf_kp = first_num_any(maf, ['kp','kp_index','kp_current'])
-            maf_cloud = first_num_any(maf, ['cloud_cover','clouds','cloud'])
-            maf_prob_disp = first_num_any(maf, ['chance','probability','visibility','aurora_probability'])
+            maf_kp = find_num_nested(maf, MAF_SUMMARY_KP_KEYS)
+            maf_cloud = find_num_nested(maf, MAF_CLOUD_KEYS)
+            # Same key set as maf_prob above; reuse that walk instead of searching the payload again
+            maf_prob_disp = maf_prob_raw
             parts = []
             if isinstance(maf_kp, (int, float)):
                 parts.append(f"KP {float(maf_kp):.2f}")
@@ -1177,58 +1397,12 @@ class ForecastEngine:
         afm_next_hours_lines: List[str] | None = None
         if snapshot:
             try:
-                tonight = snapshot.get('tonight', {})
-                cond = snapshot.get('conditions', {})
-                ui = snapshot.get('ui', {})
-                status_texts = (ui.get('statusTexts') or {}) if isinstance(ui, dict) else {}
-                status_key = tonight.get('status', 'n/a')
-                status_human = status_texts.get(status_key, str(status_key).replace('_', ' ').title())
-                prob = tonight.get('probability', 'n/a')
-                best = tonight.get('bestHour', 'n/a')
-                updated_at = tonight.get('updatedAt') or snapshot.get('updatedAt')
-                updated_line = ''
-                if isinstance(updated_at, str):
-                    try:
-                        upd_dt = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                        upd_ts = int(upd_dt.timestamp())
-                        updated_line = f" • updated <t:{upd_ts}:R>"
-                    except Exception:
-                        pass
-                kp_idx = cond.get('kpIndex', 'n/a')
-                cc = cond.get('cloudCover', 'n/a')
-                darkness = cond.get('skyDarkness', 'n/a')
-                afm_tonight_line = f"Tonight: {status_human} • {prob}% • Best: {best}{updated_line}"
-                afm_conditions_line = f"Conditions: KP {kp_idx} • ☁️ {cc}% • Sky: {darkness}"
+                afm_tonight_line, afm_conditions_line = self._afm_summary_lines(snapshot)
                 h12 = snapshot.get('h12', [])
                 if h12:
                     afm_next_hours_lines = []
                     for item in h12[:3]:
-                        iso = item.get('time')
-                        ts_part = ''
-                        if isinstance(iso, str):
-                            try:
-                                ts_dt = datetime.fromisoformat(iso.replace('Z', '+00:00'))
-                                ts_part = f"<t:{int(ts_dt.timestamp())}:t>"
-                            except Exception:
-                                ts_part = ''
-                        if not ts_part:
-                            ts_part = item.get('displayTime12') or item.get('displayTime24') or '?'
-                        kpv = item.get('kp', '?')
-                        pbase = item.get('probBase', '?')
-                        padj = item.get('probAdj', '?')
-                        try:
-                            kpv = f"{float(kpv):.2f}"
-                        except Exception:
-                            pass
-                        try:
-                            pbase = f"{float(pbase):.0f}"
-                        except Exception:
-                            pass
-                        try:
-                            padj = f"{float(padj):.1f}"
-                        except Exception:
-                            pass
-                        afm_next_hours_lines.append(f"• {ts_part}: KP {kpv} • base {pbase}% • adj +{padj}%")
+                        afm_next_hours_lines.append(f"• {self._afm_hour_entry(item)}")
             except Exception:
                 afm_tonight_line = "AFM snapshot: parse error"
 
@@ -1250,6 +1424,8 @@ class ForecastEngine:
             agg_parts.append(f"MAF {maf_prob}%")
         aggregated_sources_line = "Sources: " + " • ".join(agg_parts) if agg_parts else None
 
+        # Detection groups by date, shared by the message body and the embed fields
+        detection_groups = self._group_detections(detections)
         # Build flat message (legacy) and structured groups (now suppressing separate GFZ/NOAA blocks if aggregated line present)
         message = self._render_message(
             detections,
@@ -1264,29 +1440,15 @@ class ForecastEngine:
             swpc_summary_lines=[] if aggregated_sources_line else swpc_summary_lines,
             swpc_source_note=None if aggregated_sources_line else swpc_source_note,
             aggregated_sources_line=aggregated_sources_line,
+            detected_ts=int(now_utc.timestamp()),
+            detection_groups=detection_groups,
         )
-        # Detection groups by date for embed fields
-        detection_groups: Dict[str, List[str]] = {}
-        for d in detections:
-            detection_groups.setdefault(d.local_date_label, []).append(d.bullet)
         # Recommendations
         recommendation_lines: List[str] = []
         upcoming_days_lines: List[str] = []
 
-        # Helper to combine percents with weights
-        def _combine_percents(pairs: List[Tuple[Optional[int], float]]) -> Optional[int]:
-            total = 0.0
-            wsum = 0.0
-            for val, w in pairs:
-                if isinstance(val, int):
-                    total += max(0, min(100, val)) * w
-                    wsum += w
-            if wsum <= 0:
-                return None
-            return int(round(total / wsum))
-
         # Tonight best window (next ~18h)
-        now_ts = int(datetime.now(timezone.utc).timestamp())
+        now_ts = int(now_utc.timestamp())
         horizon_ts = now_ts + 18 * 3600
         next_windows = [x for x in detections if x.start_ts >= now_ts and x.start_ts <= horizon_ts]
         best_next = max(next_windows, key=lambda x: x.visibility_pct) if next_windows else None
@@ -1302,12 +1464,12 @@ class ForecastEngine:
             afm_prob = None
 
         if best_next:
-            combined = _combine_percents([
+            combined = _combine_percents((
                 (best_next.visibility_pct, 0.5),
                 (afm_prob, 0.25),
                 (ovation_prob if isinstance(ovation_prob, int) else None, 0.15),
                 (maf_prob if isinstance(maf_prob, int) else None, 0.10),
-            ])
+            ))
             if combined is None:
                 combined = best_next.visibility_pct
             label = "Unlikely"
@@ -1316,12 +1478,10 @@ class ForecastEngine:
             elif combined >= 30:
                 label = "Maybe"
             extras: List[str] = []
-            try:
-                best_hour = ((snapshot or {}).get('tonight') or {}).get('bestHour')
-                if isinstance(best_hour, str) and best_hour:
-                    extras.append(f"AFM best: {best_hour}")
-            except Exception:
-                pass
+            tonight = snapshot.get('tonight') if isinstance(snapshot, dict) else None
+            best_hour = tonight.get('bestHour') if isinstance(tonight, dict) else None
+            if isinstance(best_hour, str) and best_hour:
+                extras.append(f"AFM best: {best_hour}")
             if isinstance(gfz_latest_value, (int, float)):
                 extras.append(f"GFZ Kp {float(gfz_latest_value):.1f}")
             if isinstance(ovation_prob, int):
@@ -1337,10 +1497,10 @@ class ForecastEngine:
                 line += " • " + " • ".join(extras)
             recommendation_lines.append(line)
         else:
-            combined = _combine_percents([
+            combined = _combine_percents((
                 (afm_prob, 0.6),
                 (ovation_prob if isinstance(ovation_prob, int) else None, 0.4),
-            ])
+            ))
             if combined is not None:
                 label = "Unlikely"
                 if combined >= 60:
@@ -1380,14 +1540,10 @@ class ForecastEngine:
                 extras.append(f"Hemi {float(hemi_total):.0f} GW")
             if isinstance(gfz_latest_value, (int, float)):
                 extras.append(f"GFZ {float(gfz_latest_value):.1f}")
-            try:
-                darkness = None
-                if snapshot and isinstance(snapshot, dict):
-                    darkness = ((snapshot.get('conditions') or {}) or {}).get('skyDarkness')
-                if isinstance(darkness, str) and darkness:
-                    extras.append(f"Sky {darkness}")
-            except Exception:
-                pass
+            conditions = snapshot.get('conditions') if isinstance(snapshot, dict) else None
+            darkness = conditions.get('skyDarkness') if isinstance(conditions, dict) else None
+            if isinstance(darkness, str) and darkness:
+                extras.append(f"Sky {darkness}")
             line = f"{date_label}: {rng} • 👀 {best.visibility_pct}% • KP {best.kp:.2f} • ☁️ {best.cloud_avg_display}"
             if extras:
                 line += " • " + " • ".join(extras)
@@ -1428,6 +1584,81 @@ class ForecastEngine:
             swpc_high_block=swpc_high_block,
         )
 
+    def _group_detections(self, detections: List[Detection]) -> Dict[str, List[str]]:
+        """Group detection bullets by local calendar date, in date order.
+        Keys are the Discord date label of each day's first window so the heading renders in the viewer's locale.
+        """
+        by_day: Dict[date, List[Detection]] = defaultdict(list)
+        try:
+            local_tz = self.local_tz
+        except (ZoneInfoNotFoundError, ValueError):
+            # Grouping only picks day boundaries; an unknown TIMEZONE_NAME falls back to UTC days instead of failing the build
+            local_tz = timezone.utc
+        for d in detections:
+            by_day[datetime.fromtimestamp(d.start_ts, tz=local_tz).date()].append(d)
+        return {
+            dets[0].local_date_label: [d.bullet for d in dets]
+            for _, dets in sorted(by_day.items())
+        }
+
+    @staticmethod
+    def _afm_summary_lines(snapshot: dict) -> Tuple[str, str]:
+        """Format the AFM 'Tonight' and 'Conditions' lines shared by the embed fields and the flat message."""
+        tonight = snapshot.get('tonight', {})
+        cond = snapshot.get('conditions', {})
+        ui = snapshot.get('ui', {})
+        status_texts = (ui.get('statusTexts') or {}) if isinstance(ui, dict) else {}
+        status_key = tonight.get('status', 'n/a')
+        status_human = status_texts.get(status_key, str(status_key).replace('_', ' ').title())
+        prob = tonight.get('probability', 'n/a')
+        best = tonight.get('bestHour', 'n/a')
+        updated_at = tonight.get('updatedAt') or snapshot.get('updatedAt')
+        updated_line = ''
+        if isinstance(updated_at, str):
+            try:
+                upd_dt = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
+                upd_ts = int(upd_dt.timestamp())
+                updated_line = f" • updated <t:{upd_ts}:R>"
+            except Exception:
+                pass
+        kp_idx = cond.get('kpIndex', 'n/a')
+        cc = cond.get('cloudCover', 'n/a')
+        darkness = cond.get('skyDarkness', 'n/a')
+        return (
+            f"Tonight: {status_human} • {prob}% • Best: {best}{updated_line}",
+            f"Conditions: KP {kp_idx} • ☁️ {cc}% • Sky: {darkness}",
+        )
+
+    @staticmethod
+    def _afm_hour_entry(item: dict) -> str:
+        """Format one AFM h12 entry as '<time>: KP x • base y% • adj +z%'."""
+        iso = item.get('time')
+        ts_part = ''
+        if isinstance(iso, str):
+            try:
+                ts_dt = datetime.fromisoformat(iso.replace('Z', '+00:00'))
+                ts_part = f"<t:{int(ts_dt.timestamp())}:t>"
+            except Exception:
+                ts_part = ''
+        if not ts_part:
+            ts_part = item.get('displayTime12') or item.get('displayTime24') or '?'
+        kpv = item.get('kp', '?')
+        pbase = item.get('probBase', '?')
+        padj = item.get('probAdj', '?')
+        try:
+            kpv = f"{float(kpv):.2f}"
+        except Exception:
+            pass
+        try:
+            pbase = f"{float(pbase):.0f}"
+        except Exception:
+            pass
+        try:
+            padj = f"{float(padj):.1f}"
+        except Exception:
+            pass
+        return f"{ts_part}: KP {kpv} • base {pbase}% • adj +{padj}%"
+
     def _tonight_url(self) -> str:
         return "https://services.swpc.noaa.gov/experimental/images/aurora_dashboard/tonights_static_viewline_forecast.png"
 
@@ -1448,110 +1679,67 @@ class ForecastEngine:
         swpc_summary_lines: Optional[List[str]] = None,
         swpc_source_note: Optional[str] = None,
         aggregated_sources_line: Optional[str] = None,
+        detected_ts: Optional[int] = None,
+        detection_groups: Optional[Dict[str, List[str]]] = None,
     ) -> str:
-        detected_ts = int(datetime.now(timezone.utc).timestamp())
-        msg = "🌌 **AURORA UPDATE**\n\n"
-        msg += f"Detected: <t:{detected_ts}:F> (→ <t:{detected_ts}:R>)\n"
-        msg += f"Location: {self.location_name} ({self.latitude:.4f}, {self.longitude:.4f})\n"
-        msg += "[Aurora Dashboard](https://www.swpc.noaa.gov/communities/aurora-dashboard-experimental)\n"
+        if detected_ts is None:
+            detected_ts = int(datetime.now(timezone.utc).timestamp())
+        parts: List[str] = [self.MESSAGE_HEADER]
+        parts.append(f"Detected: <t:{detected_ts}:F> (→ <t:{detected_ts}:R>)\n")
+        parts.append(f"Location: {self.location_name} ({self.latitude:.4f}, {self.longitude:.4f})\n")
+        parts.append(self.DASHBOARD_LINE)
         # Condensed merged sources line replaces individual GFZ/NOAA sections when provided
         if aggregated_sources_line:
-            msg += aggregated_sources_line + "\n"
+            parts.append(aggregated_sources_line + "\n")
         else:
             if gfz_latest_line:
-                msg += gfz_latest_line + "\n"
+                parts.append(gfz_latest_line + "\n")
             if gfz_summary_lines:
-                msg += f"\n**GFZ Potsdam (recent Kp ≥ {self.kp_threshold})**\n"
+                parts.append(f"\n**GFZ Potsdam (recent Kp ≥ {self.kp_threshold})**\n")
                 for line in gfz_summary_lines:
-                    msg += line + "\n"
+                    parts.append(line + "\n")
             if gfz_source_note:
-                msg += gfz_source_note + "\n"
+                parts.append(gfz_source_note + "\n")
             if swpc_planetary_line or swpc_summary_lines:
-                msg += "\n**NOAA SWPC (real-time)**\n"
+                parts.append("\n**NOAA SWPC (real-time)**\n")
                 if swpc_planetary_line and (not swpc_summary_lines or (swpc_summary_lines and swpc_summary_lines[0] != swpc_planetary_line)):
-                    msg += swpc_planetary_line + "\n"
+                    parts.append(swpc_planetary_line + "\n")
                 if swpc_summary_lines:
                     for line in swpc_summary_lines:
                         if swpc_planetary_line and line == swpc_planetary_line:
                             continue
-                        msg += line + "\n"
+                        parts.append(line + "\n")
             if swpc_source_note:
-                msg += swpc_source_note + "\n"
+                parts.append(swpc_source_note + "\n")
         if cloud_available:
-            msg += f"☁️ Cloud data: retrieved for {self.location_name}\n"
+            parts.append(f"☁️ Cloud data: retrieved for {self.location_name}\n")
         else:
-            msg += f"☁️ Cloud data: unavailable for {self.location_name}\n"
+            parts.append(f"☁️ Cloud data: unavailable for {self.location_name}\n")
         if ovation_prob is not None:
-            msg += f"🌐 NOAA Ovation (now): {ovation_prob}% at your location\n"
+            parts.append(f"🌐 NOAA Ovation (now): {ovation_prob}% at your location\n")
         if maf_summary:
-            msg += f"📱 {maf_summary}\n"
+            parts.append(f"📱 {maf_summary}\n")
 
         if snapshot:
             try:
-                tonight = snapshot.get('tonight', {})
-                cond = snapshot.get('conditions', {})
-                ui = snapshot.get('ui', {})
-                status_texts = (ui.get('statusTexts') or {}) if isinstance(ui, dict) else {}
-                status_key = tonight.get('status', 'n/a')
-                status_human = status_texts.get(status_key, str(status_key).replace('_', ' ').title())
-                prob = tonight.get('probability', 'n/a')
-                best = tonight.get('bestHour', 'n/a')
-                updated_at = tonight.get('updatedAt') or snapshot.get('updatedAt')
-                updated_line = ''
-                if isinstance(updated_at, str):
-                    try:
-                        upd_dt = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                        upd_ts = int(upd_dt.timestamp())
-                        updated_line = f" • updated <t:{upd_ts}:R>"
-                    except Exception:
-                        pass
-                kp_idx = cond.get('kpIndex', 'n/a')
-                cc = cond.get('cloudCover', 'n/a')
-                darkness = cond.get('skyDarkness', 'n/a')
-                msg += "\n**AuroraForecast.me**\n"
-                msg += f"Tonight: {status_human} • {prob}% • Best: {best}{updated_line}\n"
-                msg += f"Conditions: KP {kp_idx} • ☁️ {cc}% • Sky: {darkness}\n"
+                tonight_line, conditions_line = self._afm_summary_lines(snapshot)
+                parts.append(self.AFM_HEADER)
+                parts.append(tonight_line + "\n")
+                parts.append(conditions_line + "\n")
                 h12 = snapshot.get('h12', [])
                 if h12:
-                    msg += "Next hours:\n"
+                    parts.append("Next hours:\n")
                     for item in h12[:3]:
-                        iso = item.get('time')
-                        ts_part = ''
-                        if isinstance(iso, str):
-                            try:
-                                ts_dt = datetime.fromisoformat(iso.replace('Z', '+00:00'))
-                                ts_part = f"<t:{int(ts_dt.timestamp())}:t>"
-                            except Exception:
-                                ts_part = ''
-                        if not ts_part:
-                            ts_part = item.get('displayTime12') or item.get('displayTime24') or '?'
-                        kpv = item.get('kp', '?')
-                        pbase = item.get('probBase', '?')
-                        padj = item.get('probAdj', '?')
-                        try:
-                            kpv = f"{float(kpv):.2f}"
-                        except Exception:
-                            pass
-                        try:
-                            pbase = f"{float(pbase):.0f}"
-                        except Exception:
-                            pass
-                        try:
-                            padj = f"{float(padj):.1f}"
-                        except Exception:
-                            pass
-                        msg += f"  • {ts_part}: KP {kpv} • base {pbase}% • adj +{padj}%\n"
+                        parts.append(f"  • {self._afm_hour_entry(item)}\n")
             except Exception:
-                msg += "AFM snapshot: parse error\n"
+                parts.append("AFM snapshot: parse error\n")
 
         if detections:
-            grouped: Dict[str, List[str]] = {}
-            for d in detections:
-                grouped.setdefault(d.local_date_label, []).append(d.bullet)
-            for date_label in sorted(grouped.keys()):
-                msg += f"**{date_label}**\n"
-                for bullet in grouped[date_label]:
-                    msg += bullet + "\n"
+            if detection_groups is None:
+                detection_groups = self._group_detections(detections)
+            for date_label, bullets in detection_groups.items():
+                parts.append(f"**{date_label}**\n")
+                parts.extend(bullet + "\n" for bullet in bullets)
         else:
-            msg += "\nNo high Kp windows currently at or above your threshold.\n"
-        return msg
+            parts.append(self.NO_WINDOWS_LINE)
+        return "".join(parts)
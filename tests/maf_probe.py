@@ -6,27 +6,28 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from dotenv import load_dotenv
-from aurora.forecast import ForecastEngine
+from aurora.forecast import ForecastEngine, MAF_CLOUD_KEYS, MAF_PROB_KEYS
 
-def _find_num_nested(obj, keys_lower):
-    try:
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                try:
-                    if isinstance(k, str) and k.lower() in keys_lower and isinstance(v, (int, float)):
-                        return float(v)
-                except Exception:
-                    pass
-                res = _find_num_nested(v, keys_lower)
-                if res is not None:
-                    return res
-        elif isinstance(obj, list):
-            for it in obj:
-                res = _find_num_nested(it, keys_lower)
-                if res is not None:
-                    return res
-    except Exception:
-        return None
+# Kp keys reported by the probe; a superset of the bot summary keys that also accepts "kp current"
+PROBE_KP_KEYS = frozenset({'kp', 'kp_index', 'kp current', 'kp_current'})
+
+def _find_num_nested(obj, keys_lower: frozenset):
+    # Iterative pre-order walk: each stack entry is an iterator of (key, value) pairs, so the first match
+    # in document order wins exactly as with the recursive form, without a Python frame per node
+    lower = str.lower
+    stack = [iter(((None, obj),))]
+    while stack:
+        for k, v in stack[-1]:
+            if isinstance(k, str) and lower(k) in keys_lower and isinstance(v, (int, float)):
+                return float(v)
+            if isinstance(v, dict):
+                stack.append(iter(v.items()))
+                break
+            if isinstance(v, list):
+                stack.append((None, it) for it in v)
+                break
+        else:
+            stack.pop()
     return None
 
 
@@ -46,15 +47,22 @@ def main():
     try:
         if isinstance(data, dict):
             print('Top-level keys:', ', '.join(list(data.keys())[:15]))
-        preview = json.dumps(data, indent=2)
-        print(preview[:1200])
+        # Encode lazily and stop once the preview is filled instead of pretty-printing the whole payload
+        chunks = []
+        size = 0
+        for chunk in json.JSONEncoder(indent=2).iterencode(data):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= 1200:
+                break
+        print(''.join(chunks)[:1200])
     except Exception:
         print(str(data)[:1200])
 
     # Extract the fields the bot uses for the My Aurora Forecast summary
-    maf_kp = _find_num_nested(data, ['kp', 'kp_index', 'kp current', 'kp_current'])
-    maf_prob = _find_num_nested(data, ['chance', 'probability', 'visibility', 'aurora_probability'])
-    maf_cloud = _find_num_nested(data, ['cloud_cover', 'clouds', 'cloud'])
+    maf_kp = _find_num_nested(data, PROBE_KP_KEYS)
+    maf_prob = _find_num_nested(data, MAF_PROB_KEYS)
+    maf_cloud = _find_num_nested(data, MAF_CLOUD_KEYS)
 
     parts = []
     if isinstance(maf_kp, (int, float)):
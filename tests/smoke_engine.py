@@ -4,14 +4,50 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 from aurora.forecast import ForecastEngine
 
+# Expected parse of forecastExample.txt; keeps hand-written edits to the Kp table parser honest
+EXPECTED_DAYS = ['Sep 15', 'Sep 16', 'Sep 17']
+EXPECTED_ROWS = [
+    ('00-03', [6.67, 3.67, 2.67]),
+    ('03-06', [5.33, 3.67, 3.0]),
+    ('06-09', [5.0, 2.67, 2.67]),
+    ('09-12', [4.67, 2.0, 2.0]),
+    ('12-15', [5.67, 1.67, 2.0]),
+    ('15-18', [5.0, 1.0, 7.67]),
+    ('18-21', [4.0, 7.0, 2.33]),
+    ('21-00', [3.67, 3.0, 2.67]),
+]
+EXPECTED_DETECTIONS = [('Sep 15', '00-03UT', 6.67), ('Sep 16', '18-21UT', 7.0), ('Sep 17', '15-18UT', 7.67)]
+
+def check_parse(text):
+    variants = {
+        'example': text,
+        'crlf': text.replace('\n', '\r\n'),
+        'no_rationale': text.split('Rationale:')[0],
+        'attached_g': text.replace(' (G', '(G'),
+    }
+    for name, variant in variants.items():
+        parsed = ForecastEngine._parse_kp_table(variant)
+        assert parsed is not None, f"{name}: Kp section not found"
+        issued_year, days, rows = parsed
+        assert issued_year == 2025, f"{name}: issued year {issued_year}"
+        assert days == EXPECTED_DAYS, f"{name}: days {days}"
+        assert [(interval, list(vals)) for interval, vals in rows] == EXPECTED_ROWS, f"{name}: rows {rows}"
+    missing_year = ForecastEngine._parse_kp_table(text.replace(':Issued:', ':Released:'))
+    assert missing_year is not None and missing_year[0] is None and len(missing_year[2]) == 8
+    assert ForecastEngine._parse_kp_table(text.replace('NOAA Kp index breakdown', '')) is None
+
 def main():
-    with open('forecastExample.txt','r') as f:
+    with open(os.path.join(ROOT, 'forecastExample.txt'), 'r', encoding='utf-8') as f:
         text = f.read()
+    check_parse(text)
     eng = ForecastEngine(kp_threshold=6.2)
     build = eng.build_alert(text, debug=False)
-    print('detections:', [(d.day_label, d.ut_block, d.kp) for d in build.detections])
+    detections = [(d.day_label, d.ut_block, d.kp) for d in build.detections]
+    print('detections:', detections)
     print('window_id:', build.window_id)
     print('message first line:', build.message.splitlines()[0])
+    assert detections == EXPECTED_DETECTIONS, f"detections {detections}"
+    print('parse checks: ok')
 
 if __name__ == '__main__':
     main()